@@ -0,0 +1,50 @@
+import time
+import logging
+import click
+from app import app, db
+from models import CareerProfile
+import recommender
+
+
+@app.cli.command("init-db")
+def init_db():
+    """Create any missing database tables and indexes"""
+    import models  # noqa: F401
+    db.create_all()
+    # create_all leaves tables that already exist alone, add indexes declared since then
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+    logging.info("Database tables created")
+
+
+@app.cli.command("recommend-all")
+@click.option("--page-size", default=500, help="Profiles loaded and scored per batch")
+@click.option("--top-n", default=5)
+def recommend_all(page_size, top_n):
+    """Recompute and cache recommendations for every career profile"""
+    engine = recommender.get_engine()
+    start = time.perf_counter()
+    total = 0
+    last_id = 0
+    while True:
+        # Keyset pagination keeps memory flat however many profiles there are
+        profiles = db.session.execute(
+            db.select(CareerProfile).where(CareerProfile.id > last_id).order_by(CareerProfile.id).limit(page_size)
+        ).scalars().all()
+        if not profiles:
+            break
+        user_inputs = [recommender.profile_to_user_input(p) for p in profiles]
+        filters = [recommender.profile_filters(p) for p in profiles]
+        batch_results = engine.recommend_batch(user_inputs, top_n=top_n, filters=filters)
+        for profile, user_input, profile_filters, results in zip(profiles, user_inputs, filters, batch_results):
+            recommender.store_recommendations(profile, results,
+                                              recommender.recommendation_key(user_input, top_n, profile_filters,
+                                                                             engine.catalog_version))
+        db.session.commit()
+        total += len(profiles)
+        last_id = profiles[-1].id
+        db.session.expunge_all()
+
+    elapsed = time.perf_counter() - start
+    logging.info("Recommended for %d profiles in %.2fs (%.1f profiles/sec)", total, elapsed, total / elapsed if elapsed else 0.0)
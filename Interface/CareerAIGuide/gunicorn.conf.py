@@ -0,0 +1,24 @@
+import gc
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+
+# Import the app (and with PRELOAD_RECOMMENDER=1 build the recommender) once in the
+# master; forked workers then share the loaded modules and arrays copy-on-write
+preload_app = os.environ.get("PRELOAD_RECOMMENDER") == "1"
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the collector's generations, otherwise the
+    # first collection in each worker writes to every shared page and un-shares it
+    if preload_app:
+        gc.freeze()
+        server.log.info("Preloaded app, froze %d objects for copy-on-write sharing", gc.get_freeze_count())
+
+
+def post_worker_init(worker):
+    # Jobs queued by a previous process (or lost with a dead worker) are otherwise only
+    # picked up when their user opens the dashboard again
+    import jobs
+    jobs.resume_queue()
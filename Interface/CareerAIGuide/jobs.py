@@ -0,0 +1,125 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from app import app, db
+from models import CareerProfile, RecommendationJob
+import recommender
+
+# The recommendation_jobs table is the queue; any process sharing the database can drain it
+WORKERS = int(os.environ.get("RECOMMENDATION_WORKERS", "2"))
+# Jobs running longer than this are assumed lost with their worker and can be queued again
+JOB_TIMEOUT = timedelta(minutes=int(os.environ.get("RECOMMENDATION_JOB_TIMEOUT_MINUTES", "10")))
+# A failed run is retried once it is this old, until then the dashboard reports it as unavailable
+FAILED_RETRY = timedelta(minutes=int(os.environ.get("RECOMMENDATION_RETRY_MINUTES", "5")))
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='recommendations')
+
+
+def latest_job(profile_id):
+    return RecommendationJob.query.filter_by(profile_id=profile_id).order_by(RecommendationJob.id.desc()).first()
+
+
+def is_lost(job):
+    """A queued job nobody drained or a running one whose worker died"""
+    cutoff = datetime.utcnow() - JOB_TIMEOUT
+    return ((job.status == 'queued' and job.created_at < cutoff)
+            or (job.status == 'running' and (job.started_at or job.created_at) < cutoff))
+
+
+def needs_run(job):
+    """Whether a profile whose latest job is job (or None) should get a new run"""
+    if job is None or job.status == 'done':
+        return True
+    if job.status == 'failed':
+        return job.finished_at is None or job.finished_at < datetime.utcnow() - FAILED_RETRY
+    return is_lost(job)
+
+
+def ensure_recommendation(profile):
+    """Latest job for a profile whose recommendations are missing, queuing a run if none is in flight"""
+    job = latest_job(profile.id)
+    return enqueue_recommendation(profile) if needs_run(job) else job
+
+
+def enqueue_recommendation(profile):
+    """Queue a recommendation run for a profile unless one is already waiting"""
+    # A queued job reads the profile when it starts, so it will pick up this version too
+    job = latest_job(profile.id)
+    if job and job.status == 'queued':
+        if is_lost(job):
+            # Queued by a process that went away before draining it
+            _executor.submit(_drain_queue)
+        return job
+
+    job = RecommendationJob(profile_id=profile.id, status='queued')
+    db.session.add(job)
+    db.session.commit()
+    _executor.submit(_drain_queue)
+    return job
+
+
+def _expire_lost_jobs():
+    # Their worker is gone, mark them failed so a new run can be queued
+    expired = db.session.execute(
+        db.update(RecommendationJob)
+        .where(RecommendationJob.status == 'running', RecommendationJob.started_at < datetime.utcnow() - JOB_TIMEOUT)
+        .values(status='failed', error='Worker lost before the job finished', finished_at=datetime.utcnow())
+    ).rowcount
+    db.session.commit()
+    if expired:
+        logging.warning("Marked %d lost recommendation jobs as failed", expired)
+
+
+def _claim_next_job():
+    while True:
+        job_id = db.session.execute(
+            db.select(RecommendationJob.id).where(RecommendationJob.status == 'queued')
+            .order_by(RecommendationJob.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            return None
+        # Conditional update so two workers never run the same job
+        claimed = db.session.execute(
+            db.update(RecommendationJob)
+            .where(RecommendationJob.id == job_id, RecommendationJob.status == 'queued')
+            .values(status='running', started_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(RecommendationJob, job_id)
+
+
+def _run_job(job):
+    try:
+        profile = db.session.get(CareerProfile, job.profile_id)
+        user_input = recommender.profile_to_user_input(profile)
+        filters = recommender.profile_filters(profile)
+        engine = recommender.get_engine()
+        results = engine.recommend(user_input, top_n=recommender.TOP_N, filters=filters)
+        recommender.store_recommendations(profile, results, recommender.recommendation_key(
+            user_input, recommender.TOP_N, filters, engine.catalog_version))
+        job.status = 'done'
+    except Exception as exc:
+        db.session.rollback()
+        logging.exception("Recommendation job %s failed", job.id)
+        job = db.session.get(RecommendationJob, job.id)
+        job.status = 'failed'
+        job.error = str(exc)
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def resume_queue():
+    """Drain jobs left queued by a previous process, call once per worker process at startup"""
+    _executor.submit(_drain_queue)
+
+
+def _drain_queue():
+    with app.app_context():
+        _expire_lost_jobs()
+        while True:
+            job = _claim_next_job()
+            if job is None:
+                return
+            _run_job(job)
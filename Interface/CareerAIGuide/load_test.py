@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+from collections import defaultdict
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queries and latency per request for the main pages")
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    # A throwaway SQLite database stands in for Postgres; must be set before the app is imported
+    workdir = tempfile.mkdtemp(prefix='career-load-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'load_test.db')}"
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from sqlalchemy import event
+    import main as app_main  # noqa: F401
+    import recommender
+    from app import app, db
+    from models import User, CareerProfile
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        db.create_all()
+        for i in range(args.users):
+            user = User(username=f"loaduser{i}", email=f"loaduser{i}@example.com")
+            user.set_password('password')
+            # Odd users have a profile with cached recommendations, even ones have none yet
+            if i % 2:
+                user.career_profile = CareerProfile(full_name=f"Load User {i}", current_profession='engineer',
+                                                    current_skills='python', area_of_interests='software',
+                                                    expected_salary_min=50000, expected_salary_max=90000,
+                                                    years_of_experience=3)
+            db.session.add(user)
+        db.session.commit()
+        for profile in CareerProfile.query.all():
+            key = recommender.recommendation_key(recommender.profile_to_user_input(profile), recommender.TOP_N,
+                                                 recommender.profile_filters(profile), recommender.catalog_version())
+            recommender.store_recommendations(profile, [], key)
+        db.session.commit()
+        engine = db.engine
+
+    queries = defaultdict(list)
+    latencies = defaultdict(list)
+    counter = {'n': 0}
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def count_query(*_):
+        counter['n'] += 1
+
+    def request(client, label, method, url, **kwargs):
+        counter['n'] = 0
+        start = time.perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        latencies[label].append(time.perf_counter() - start)
+        queries[label].append(counter['n'])
+        return response
+
+    for round_number in range(args.rounds):
+        for i in range(1, args.users, 2):
+            client = app.test_client()
+            request(client, 'POST /login', 'post', '/login', data={'username': f"loaduser{i}", 'password': 'password'})
+            request(client, 'GET /dashboard', 'get', '/dashboard')
+            request(client, 'GET /profile', 'get', '/profile')
+            request(client, 'GET /api/recommendations/status', 'get', '/api/recommendations/status')
+        for i in range(5):
+            # Taken username, taken email, then a fresh account
+            for label, username, email in (('POST /register [taken username]', 'loaduser0', f"new{round_number}_{i}@x.com"),
+                                           ('POST /register [taken email]', f"new{round_number}_{i}", 'loaduser0@example.com'),
+                                           ('POST /register [new]', f"new{round_number}_{i}", f"new{round_number}_{i}@x.com")):
+                request(app.test_client(), label, 'post', '/register',
+                        data={'username': username, 'email': email, 'password': 'password', 'password2': 'password'})
+
+    print(f"{'request':<34}{'count':>7}{'queries/req':>13}{'mean ms':>10}")
+    for label in queries:
+        count = len(queries[label])
+        print(f"{label:<34}{count:>7}{sum(queries[label]) / count:>13.2f}"
+              f"{sum(latencies[label]) / count * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,20 @@
+import os
 from app import app
 import routes  
+import cli  # noqa: F401
+import recommender
+
+# With `gunicorn -c gunicorn.conf.py main:app` this runs once in the master process
+# and the warm engine is shared copy-on-write by every forked worker; otherwise the
+# engine and its ML imports load on the first recommendation request
+if os.environ.get("PRELOAD_RECOMMENDER") == "1":
+    recommender.get_engine()
 
 if __name__ == "__main__":
+    # The development server sets up the schema itself, deployments run `flask --app main init-db`
+    from app import db
+    with app.app_context():
+        db.create_all()
+    import jobs
+    jobs.resume_queue()
     app.run(host="0.0.0.0", port=5000, debug=True)
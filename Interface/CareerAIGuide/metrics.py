@@ -0,0 +1,67 @@
+import bisect
+import threading
+from collections import OrderedDict
+
+# Histogram bucket upper bounds in seconds, Prometheus style
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+STAGES = ('load', 'encode', 'similarity', 'scoring', 'ranking', 'total')
+
+
+class StageHistogram:
+    """Cumulative latency histogram for one pipeline stage"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+_histograms = OrderedDict((stage, StageHistogram()) for stage in STAGES)
+_lock = threading.Lock()
+
+
+def observe(timings):
+    """Record a request's per-stage timings (seconds)"""
+    with _lock:
+        for stage, seconds in timings.items():
+            _histograms.setdefault(stage, StageHistogram()).observe(seconds)
+
+
+def server_timing_header(timings):
+    return ', '.join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+
+def render_prometheus(user_cache=None):
+    """Text exposition of all stage histograms, plus the user embedding cache counters
+    when given. Each worker process keeps its own counts."""
+    lines = [
+        '# HELP recommendation_stage_seconds Time spent in each recommendation pipeline stage',
+        '# TYPE recommendation_stage_seconds histogram',
+    ]
+    with _lock:
+        for stage, histogram in _histograms.items():
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'recommendation_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'recommendation_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.6f}')
+            lines.append(f'recommendation_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+    if user_cache is not None:
+        lines += [
+            '# HELP user_embedding_cache_lookups_total User text embedding cache lookups by result',
+            '# TYPE user_embedding_cache_lookups_total counter',
+        ]
+        for result, key in (('hit', 'hits'), ('disk_hit', 'disk_hits'), ('miss', 'misses')):
+            lines.append(f'user_embedding_cache_lookups_total{{result="{result}"}} {user_cache[key]}')
+        lines += [
+            '# HELP user_embedding_cache_entries User text embeddings held in memory',
+            '# TYPE user_embedding_cache_entries gauge',
+            f'user_embedding_cache_entries {user_cache["entries"]}',
+        ]
+    return '\n'.join(lines) + '\n'
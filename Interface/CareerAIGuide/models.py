@@ -13,8 +13,9 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(256), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Relationship to career profile
-    career_profile = db.relationship('CareerProfile', backref='user', uselist=False, cascade='all, delete-orphan')
+    # Relationship to career profile, joined into the user query since almost every page needs it
+    career_profile = db.relationship('CareerProfile', backref='user', uselist=False, cascade='all, delete-orphan',
+                                     lazy='joined')
     
     def set_password(self, password):
         """Set password hash"""
@@ -31,7 +32,7 @@ class CareerProfile(db.Model):
     __tablename__ = 'career_profiles'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True, index=True)
     
     # Personal Information
     full_name = db.Column(db.String(100), nullable=False)
@@ -57,5 +58,59 @@ class CareerProfile(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Relationship to cached recommendations
+    recommendation = db.relationship('ProfileRecommendation', backref='profile', uselist=False, cascade='all, delete-orphan')
+    
     def __repr__(self):
         return f'<CareerProfile {self.full_name}>'
+
+class ProfileRecommendation(db.Model):
+    __tablename__ = 'profile_recommendations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    profile_id = db.Column(db.Integer, db.ForeignKey('career_profiles.id'), unique=True, nullable=False)
+    
+    # Profile version the results were computed for
+    profile_updated_at = db.Column(db.DateTime, nullable=True)
+    input_key = db.Column(db.String(64), nullable=False)
+    
+    # JSON encoded list of recommended jobs
+    results = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def is_current(self, profile, input_key):
+        """Check the cached results still match the profile"""
+        return self.input_key == input_key and self.profile_updated_at == profile.updated_at
+    
+    def __repr__(self):
+        return f'<ProfileRecommendation {self.profile_id}>'
+
+class RecommendationJob(db.Model):
+    __tablename__ = 'recommendation_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    profile_id = db.Column(db.Integer, db.ForeignKey('career_profiles.id'), nullable=False, index=True)
+    
+    # queued -> running -> done / failed
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    error = db.Column(db.Text, nullable=True)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    profile = db.relationship('CareerProfile', backref=db.backref('recommendation_jobs', cascade='all, delete-orphan'))
+    
+    def to_dict(self):
+        """JSON friendly job status"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+    
+    def __repr__(self):
+        return f'<RecommendationJob {self.id} {self.status}>'
@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from app import db
+
+# The model code lives outside the app package, point CAREER_MODEL_DIR at it when deploying
+MODEL_DIR = os.environ.get(
+    "CAREER_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..",
+                 "Personalised Carrier Recommendation using AI", "New Dataset MODEL"))
+
+# 'rules' skips the per request RandomForest fit, 'forest' keeps the original scoring
+SCORING = os.environ.get("RECOMMENDER_SCORING", "rules")
+# Score only this many nearest jobs from the ANN index, unset scores the whole catalog
+CANDIDATE_K = int(os.environ["RECOMMENDER_CANDIDATES"]) if os.environ.get("RECOMMENDER_CANDIDATES") else None
+# Also retrieve this many best skill matches (BM25 over Required Skills) as candidates
+LEXICAL_K = int(os.environ["RECOMMENDER_LEXICAL_CANDIDATES"]) if os.environ.get("RECOMMENDER_LEXICAL_CANDIDATES") else None
+# Share of the text score taken from the skill match instead of the embedding similarity
+LEXICAL_WEIGHT = float(os.environ.get("RECOMMENDER_LEXICAL_WEIGHT", "0"))
+
+# Bounded LRU of user text embeddings, RECOMMENDER_USER_CACHE_PATH also keeps them in SQLite across restarts
+USER_CACHE_SIZE = int(os.environ.get("RECOMMENDER_USER_CACHE_SIZE", "10000"))
+USER_CACHE_PATH = os.environ.get("RECOMMENDER_USER_CACHE_PATH") or None
+
+# Set to 0 to ignore the work environment and salary range fields when recommending
+PROFILE_FILTERS = os.environ.get("RECOMMENDER_PROFILE_FILTERS", "1") == "1"
+
+# Versioned model bundles published by prepare_datamodel.py; the engine loads the current one and
+# swaps in a newer one, checked at most every RECOMMENDER_BUNDLE_CHECK_SECONDS, without a restart
+BUNDLE_DIR = os.environ.get("RECOMMENDER_BUNDLE_DIR", os.path.join(MODEL_DIR, "model_bundles"))
+BUNDLE_CHECK_SECONDS = float(os.environ.get("RECOMMENDER_BUNDLE_CHECK_SECONDS", "30"))
+
+TOP_N = 5
+
+_engine = None
+_engine_lock = threading.Lock()
+# Bundle version the last build was started for, so a bundle that fails to load isn't retried
+_bundle_version = None
+_bundle_checked_at = 0.0
+_reloading = False
+
+
+def _add_model_dir_to_path():
+    if MODEL_DIR not in sys.path:
+        sys.path.insert(0, MODEL_DIR)
+
+
+def _build_engine(previous=None):
+    _add_model_dir_to_path()
+    from recommender_engine import RecommenderEngine
+    # A swap keeps the loaded sentence model and the user embedding cache
+    reused = {'model': previous.model, 'user_cache': previous.user_cache} if previous is not None else {}
+    return RecommenderEngine(embeddings_path=os.path.join(MODEL_DIR, "job_embeddings.npy"),
+                             index_path=os.path.join(MODEL_DIR, "job_index.npz"),
+                             scoring=SCORING, candidate_k=CANDIDATE_K,
+                             user_cache_size=USER_CACHE_SIZE, user_cache_path=USER_CACHE_PATH,
+                             lexical_k=LEXICAL_K, lexical_weight=LEXICAL_WEIGHT,
+                             bundle_path=BUNDLE_DIR, **reused)
+
+
+def _current_bundle_version():
+    _add_model_dir_to_path()
+    from model_bundle import current_version
+    return current_version(BUNDLE_DIR)
+
+
+def get_engine():
+    """Return the process wide RecommenderEngine, building it on first use"""
+    global _engine, _bundle_version
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                logging.info("Loading recommender engine from %s", MODEL_DIR)
+                _bundle_version = _current_bundle_version()
+                _engine = _build_engine()
+    else:
+        _check_bundle()
+    return _engine
+
+
+def _check_bundle():
+    global _bundle_version, _bundle_checked_at, _reloading
+    now = time.monotonic()
+    if now - _bundle_checked_at < BUNDLE_CHECK_SECONDS:
+        return
+    with _engine_lock:
+        if _reloading or now - _bundle_checked_at < BUNDLE_CHECK_SECONDS:
+            return
+        _bundle_checked_at = now
+        version = _current_bundle_version()
+        if version is None or version == _bundle_version:
+            return
+        _bundle_version, _reloading = version, True
+    # Requests keep using the old engine while the new one loads
+    threading.Thread(target=reload_engine, name='recommender-reload', daemon=True).start()
+
+
+def reload_engine():
+    """Build an engine from the current bundle and swap it in for the running one.
+
+    Callers that already hold the old engine finish with it; the swap is a
+    single reference assignment, so no request sees a mix of the two.
+    """
+    global _engine, _reloading
+    try:
+        engine = _build_engine(previous=_engine)
+        with _engine_lock:
+            _engine = engine
+        logging.info("Swapped in recommender engine for model bundle %s", engine.bundle_version)
+    except Exception:
+        logging.exception("Reloading the recommender engine failed, keeping the running one")
+    finally:
+        _reloading = False
+
+
+def user_cache_stats():
+    """Hit/miss counters of the engine's user embedding cache, None before the engine is loaded"""
+    return _engine.user_cache.stats() if _engine is not None else None
+
+
+def profile_to_user_input(profile):
+    """Map a CareerProfile onto the user_input dict the recommender expects"""
+    salaries = [s for s in (profile.expected_salary_min, profile.expected_salary_max) if s is not None]
+    return {
+        'interests': profile.area_of_interests,
+        'skills': profile.current_skills,
+        'profession': profile.current_profession,
+        'expected_salary': sum(salaries) / len(salaries) if salaries else 0.0,
+        'experience': profile.years_of_experience or 0,
+    }
+
+
+def profile_filters(profile):
+    """Hard filters from the profile's work preferences, see CategoryIndex.filter_rows"""
+    if not PROFILE_FILTERS:
+        return None
+    # Profiles don't record where the user lives, so willing_to_relocate only narrows the
+    # catalog once a home_location is available to go with it
+    return {
+        'work_environment': profile.preferred_work_environment,
+        'willing_to_relocate': bool(profile.willing_to_relocate),
+        'salary_min': profile.expected_salary_min,
+        'salary_max': profile.expected_salary_max,
+    }
+
+
+def catalog_version():
+    """Catalog the engine serves, the running engine's if loaded.
+
+    Before that it is worked out from the bundle directory and the CSV the way
+    the engine will, so a fresh worker still serves results stored by others.
+    """
+    engine = _engine
+    if engine is not None:
+        return engine.catalog_version
+    _add_model_dir_to_path()
+    from model_bundle import catalog_version as current_catalog_version
+    from test_model import DATASET_PATH
+    return current_catalog_version(BUNDLE_DIR, DATASET_PATH)
+
+
+def recommendation_key(user_input, top_n, filters=None, catalog=None):
+    """Hash of everything the recommender sees for a profile, catalog being catalog_version()"""
+    payload = json.dumps({'input': user_input, 'top_n': top_n, 'filters': filters, 'catalog': catalog},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def store_recommendations(profile, results, input_key):
+    from models import ProfileRecommendation
+    cached = profile.recommendation
+    if cached is None:
+        cached = ProfileRecommendation(profile=profile)
+        db.session.add(cached)
+    cached.profile_updated_at = profile.updated_at
+    cached.input_key = input_key
+    cached.results = json.dumps(results)
+    cached.created_at = datetime.utcnow()
+
+
+def current_recommendations(profile, top_n=TOP_N):
+    """Cached recommendations if they match the profile and catalog as they are now, else None"""
+    cached = profile.recommendation
+    # A bundle swap or catalog update changes the key, the stale results are then refreshed in the background
+    if cached is not None and cached.is_current(profile, recommendation_key(profile_to_user_input(profile), top_n,
+                                                                     profile_filters(profile), catalog_version())):
+        return json.loads(cached.results)
+    return None
+
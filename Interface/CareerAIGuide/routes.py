@@ -1,9 +1,14 @@
-from flask import render_template, redirect, url_for, flash, request
+import time
+from flask import render_template, redirect, url_for, flash, request, jsonify, Response
 from flask_login import login_user, logout_user, login_required, current_user
 from urllib.parse import urlparse as url_parse
+from sqlalchemy import or_
 from app import app, db
 from models import User, CareerProfile
 from forms import LoginForm, RegistrationForm, CareerProfileForm
+import recommender
+import jobs
+import metrics
 
 @app.route('/')
 def index():
@@ -37,13 +42,15 @@ def register():
     
     form = RegistrationForm()
     if form.validate_on_submit():
-        # Check if username already exists
-        if User.query.filter_by(username=form.username.data).first():
+        # One query for both uniqueness checks
+        existing = db.session.execute(
+            db.select(User.username, User.email)
+            .where(or_(User.username == form.username.data, User.email == form.email.data))
+        ).all()
+        if any(row.username == form.username.data for row in existing):
             flash('Username already exists. Please choose a different one.', 'danger')
             return render_template('register.html', title='Register', form=form)
-        
-        # Check if email already exists
-        if User.query.filter_by(email=form.email.data).first():
+        if existing:
             flash('Email already registered. Please use a different email.', 'danger')
             return render_template('register.html', title='Register', form=form)
         
@@ -71,15 +78,36 @@ def logout():
 @login_required
 def dashboard():
     """User dashboard"""
-    profile = CareerProfile.query.filter_by(user_id=current_user.id).first()
-    return render_template('dashboard.html', title='Dashboard', profile=profile)
+    profile = current_user.career_profile
+    recommendations = None
+    job = None
+    if profile:
+        # Served from the profile_recommendations table, a stale entry is refreshed in the background
+        recommendations = recommender.current_recommendations(profile)
+        if recommendations is None:
+            job = jobs.ensure_recommendation(profile)
+    return render_template('dashboard.html', title='Dashboard', profile=profile,
+                           recommendations=recommendations, job=job)
+
+@app.route('/api/recommendations/status')
+@login_required
+def recommendation_status():
+    """Background recommendation job status for the dashboard to poll"""
+    profile = current_user.career_profile
+    if not profile:
+        return jsonify({'status': 'no_profile'}), 404
+    if recommender.current_recommendations(profile) is not None:
+        return jsonify({'status': 'done'})
+    # A job lost with its worker is queued again instead of being polled forever
+    job = jobs.ensure_recommendation(profile)
+    return jsonify(job.to_dict())
 
 @app.route('/profile', methods=['GET', 'POST'])
 @login_required
 def profile():
     """Career profile form"""
     # Get existing profile or create new one
-    career_profile = CareerProfile.query.filter_by(user_id=current_user.id).first()
+    career_profile = current_user.career_profile
     
     form = CareerProfileForm()
     
@@ -118,6 +146,8 @@ def profile():
             db.session.add(career_profile)
         
         db.session.commit()
+        # Recommendations are computed off the request, the dashboard polls for them
+        jobs.enqueue_recommendation(career_profile)
         flash('Profile saved successfully! Your information has been updated.', 'success')
         return redirect(url_for('index'))
     
@@ -138,6 +168,35 @@ def profile():
     
     return render_template('profile.html', title='Career Profile', form=form, profile=career_profile)
 
+@app.route('/api/recommendations')
+@login_required
+def api_recommendations():
+    """Top-N recommendations for the current user's profile with per-stage timings"""
+    profile = current_user.career_profile
+    if not profile:
+        return jsonify({'error': 'Complete your career profile first.'}), 404
+    top_n = min(max(request.args.get('top_n', default=recommender.TOP_N, type=int), 1), 50)
+    
+    start = time.perf_counter()
+    engine = recommender.get_engine()
+    timings = {'load': time.perf_counter() - start}
+    results = engine.recommend(recommender.profile_to_user_input(profile), top_n=top_n, timings=timings,
+                               filters=recommender.profile_filters(profile))
+    timings['total'] = time.perf_counter() - start
+    metrics.observe(timings)
+    
+    response = jsonify({
+        'recommendations': results,
+        'timings_ms': {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()},
+    })
+    response.headers['Server-Timing'] = metrics.server_timing_header(timings)
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Recommendation latency histograms and cache counters for this worker process"""
+    return Response(metrics.render_prometheus(recommender.user_cache_stats()), mimetype='text/plain; version=0.0.4')
+
 @app.errorhandler(404)
 def page_not_found(error):
     return render_template('404.html'), 404
@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+from recommender import MODEL_DIR
+
+# Runs inside each measured boot: import the app like a gunicorn worker would, then
+# optionally build the recommender the way PRELOAD_RECOMMENDER=1 does
+BOOT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+heavy = sorted(m for m in ('pandas', 'sklearn', 'torch', 'sentence_transformers') if m in sys.modules)
+engine_s = None
+if {engine!r}:
+    import recommender
+    recommender.get_engine()
+    engine_s = time.perf_counter() - imported
+print(json.dumps({{'import_s': imported - start, 'engine_s': engine_s, 'heavy_modules': heavy}}))
+"""
+
+
+def clear_bytecode(*roots):
+    for root in roots:
+        for dirpath, dirnames, _ in os.walk(root):
+            if '__pycache__' in dirnames:
+                shutil.rmtree(os.path.join(dirpath, '__pycache__'), ignore_errors=True)
+
+
+def boot(engine, env):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', BOOT_SNIPPET.format(engine=engine)],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['process_s'] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold and warm boot times of the web app")
+    parser.add_argument('--warm-runs', type=int, default=3)
+    parser.add_argument('--engine', action='store_true',
+                        help="Also build the recommender engine, as PRELOAD_RECOMMENDER=1 does")
+    args = parser.parse_args()
+
+    # Cold: no bytecode caches for the app or model code. The OS page cache cannot be
+    # dropped without root, so run this first after a reboot for a true cold start
+    clear_bytecode(os.path.dirname(os.path.abspath(__file__)), MODEL_DIR)
+    env = dict(os.environ, PRELOAD_RECOMMENDER='0')
+    runs = [('cold', boot(args.engine, env))]
+    runs += [('warm', boot(args.engine, env)) for _ in range(args.warm_runs)]
+
+    print(f"{'boot':<6}{'process':>10}{'import main':>14}{'engine':>10}  heavy modules at import")
+    for label, result in runs:
+        engine = f"{result['engine_s']:.2f}s" if result['engine_s'] is not None else '-'
+        print(f"{label:<6}{result['process_s']:>9.2f}s{result['import_s']:>13.2f}s{engine:>10}  "
+              f"{', '.join(result['heavy_modules']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
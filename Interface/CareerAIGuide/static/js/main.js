@@ -235,6 +235,25 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // Poll background recommendation job and reload once results are ready
+    const recommendationsPending = document.getElementById('recommendations-pending');
+    if (recommendationsPending) {
+        const statusUrl = recommendationsPending.dataset.statusUrl;
+        const pollRecommendations = () => {
+            fetch(statusUrl, { credentials: 'same-origin' })
+                .then(response => response.json())
+                .then(job => {
+                    if (job.status === 'done' || job.status === 'failed') {
+                        window.location.reload();
+                    } else {
+                        setTimeout(pollRecommendations, 2000);
+                    }
+                })
+                .catch(() => setTimeout(pollRecommendations, 5000));
+        };
+        setTimeout(pollRecommendations, 2000);
+    }
+
     // Initialize any additional components
     initializeCustomComponents();
 });
@@ -0,0 +1,77 @@
+import os
+import sys
+import subprocess
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Builds an engine on a synthetic catalog (optionally published as a bundle), then runs one
+# recommendation job through jobs._run_job so its results are stored the way a worker stores them
+WRITER = """
+import sys
+import recommender, jobs
+from app import app, db
+from models import User, CareerProfile, RecommendationJob
+recommender._add_model_dir_to_path()
+from synthetic_data import generate_catalog
+from embedding_store import HashingEmbedder
+from recommender_engine import RecommenderEngine
+from model_bundle import write_bundle
+from test_model import DATASET_PATH
+
+workdir, bundled = sys.argv[1], sys.argv[2] == '1'
+generate_catalog(500, seed=3).to_csv(DATASET_PATH, index=False)
+model = HashingEmbedder()
+engine = RecommenderEngine(embeddings_path=f"{workdir}/emb.npy", index_path=f"{workdir}/index.npz",
+                           model=model, scoring='rules', bundle_path=recommender.BUNDLE_DIR)
+if bundled:
+    write_bundle(recommender.BUNDLE_DIR, DATASET_PATH, engine.data, engine.X, engine.preprocessor,
+                 engine.store, engine.index, embedding_model=model.name)
+    engine = RecommenderEngine(model=model, scoring='rules', bundle_path=recommender.BUNDLE_DIR)
+    assert engine.bundle_version is not None
+recommender._engine = engine
+
+with app.app_context():
+    db.create_all()
+    user = User(username='writer', email='writer@example.com')
+    user.set_password('pw')
+    user.career_profile = CareerProfile(full_name='Writer', current_skills='python, sql',
+                                        area_of_interests='technology', current_profession='engineer',
+                                        years_of_experience=3)
+    db.session.add(user)
+    db.session.commit()
+    job = RecommendationJob(profile_id=user.career_profile.id, status='running')
+    db.session.add(job)
+    db.session.commit()
+    jobs._run_job(job)
+    print("STATUS", job.status)
+"""
+
+# A fresh process that hasn't loaded an engine must see those results as current
+READER = """
+import recommender
+from app import app
+from models import CareerProfile
+with app.app_context():
+    results = recommender.current_recommendations(CareerProfile.query.one())
+    assert recommender._engine is None
+    print("CACHED", results is not None and len(results) == recommender.TOP_N)
+"""
+
+
+def run(script, env, *args):
+    result = subprocess.run([sys.executable, '-c', script, *args], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.splitlines()[-1]
+
+
+@pytest.mark.parametrize('bundled', [False, True], ids=['csv', 'bundle'])
+def test_results_stored_by_one_process_are_current_in_another(tmp_path, bundled):
+    env = dict(os.environ,
+               DATABASE_URL=f"sqlite:///{tmp_path / 'app.db'}",
+               CAREER_DATASET_PATH=str(tmp_path / 'jobs.csv'),
+               RECOMMENDER_BUNDLE_DIR=str(tmp_path / 'bundles'),
+               LOG_LEVEL='WARNING')
+    assert run(WRITER, env, str(tmp_path), '1' if bundled else '0') == "STATUS done"
+    assert run(READER, env) == "CACHED True"
@@ -0,0 +1,163 @@
+import os
+import numpy as np
+from ranking import top_k
+from atomic_file import atomic_write
+
+INDEX_PATH = "job_index.npz"
+
+
+def _row_norms(embeddings, chunk_size=65536):
+    norms = np.empty(len(embeddings), dtype=np.float32)
+    for start in range(0, len(embeddings), chunk_size):
+        chunk = np.asarray(embeddings[start:start + chunk_size], dtype=np.float32)
+        norms[start:start + chunk_size] = np.linalg.norm(chunk, axis=1)
+    norms[norms == 0] = 1.0
+    return norms
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class ExactIndex:
+    """Brute force cosine search, one normalized dot product per job"""
+
+    kind = 'exact'
+
+    def __init__(self, embeddings, norms=None):
+        self.embeddings = embeddings
+        self.norms = _row_norms(embeddings) if norms is None else norms
+
+    def scores(self, query):
+        return np.asarray(self.embeddings @ _normalize(query), dtype=np.float32) / self.norms
+
+    def score_matrix(self, queries):
+        queries = np.asarray(queries, dtype=np.float32)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        return np.asarray(self.embeddings @ queries.T, dtype=np.float32).T / self.norms
+
+    def scores_for(self, query, ids):
+        return np.asarray(self.embeddings[ids] @ _normalize(query), dtype=np.float32) / self.norms[ids]
+
+    def search(self, query, k):
+        scores = self.scores(query)
+        return top_k(np.arange(len(scores)), scores, k)
+
+    def _patched_norms(self, embeddings, old_rows):
+        reused = old_rows >= 0
+        norms = np.empty(len(embeddings), dtype=np.float32)
+        norms[reused] = self.norms[old_rows[reused]]
+        new_rows = np.where(~reused)[0]
+        if len(new_rows):
+            norms[new_rows] = _row_norms(embeddings[new_rows])
+        return norms
+
+    def patch(self, embeddings, old_rows):
+        """Index over an updated embedding matrix, old_rows[i] is row i's id in this index or -1 if new"""
+        return ExactIndex(embeddings, self._patched_norms(embeddings, old_rows))
+
+    def save(self, path, fingerprint=b''):
+        # Engines loading the index at boot must never open a half-written zip
+        with atomic_write(path) as f:
+            np.savez(f, kind=self.kind, fingerprint=np.frombuffer(fingerprint, dtype=np.uint8), norms=self.norms)
+
+
+class IVFIndex(ExactIndex):
+    """Inverted file index: jobs are bucketed under spherical k-means centroids and a
+    query only scores the jobs in its n_probe closest buckets.
+    """
+
+    kind = 'ivf'
+
+    def __init__(self, embeddings, centroids, list_offsets, list_ids, norms=None, n_probe=8):
+        super().__init__(embeddings, norms)
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.n_probe = n_probe
+
+    @classmethod
+    def build(cls, embeddings, n_lists=None, n_probe=8, n_iter=10, seed=42):
+        n = len(embeddings)
+        n_lists = n_lists or max(1, int(np.sqrt(n)))
+        n_lists = min(n_lists, n)
+        norms = _row_norms(embeddings)
+
+        # Train the centroids on a sample, sorted so memory mapped reads stay sequential
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(n, size=min(n, n_lists * 64), replace=False))
+        train = np.asarray(embeddings[sample], dtype=np.float32) / norms[sample, None]
+        centroids = train[rng.choice(len(train), size=n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assignment = np.argmax(train @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, train)
+            filled = np.bincount(assignment, minlength=n_lists) > 0
+            centroids[filled] = sums[filled] / np.linalg.norm(sums[filled], axis=1, keepdims=True)
+
+        assignment = np.empty(n, dtype=np.int64)
+        for start in range(0, n, 65536):
+            chunk = np.asarray(embeddings[start:start + 65536], dtype=np.float32)
+            assignment[start:start + 65536] = np.argmax(chunk @ centroids.T, axis=1)
+
+        list_ids = np.argsort(assignment, kind='stable')
+        list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))])
+        return cls(embeddings, centroids, list_offsets, list_ids, norms=norms, n_probe=n_probe)
+
+    def patch(self, embeddings, old_rows):
+        # Kept rows stay in their bucket and only new rows are assigned, the centroids are not
+        # retrained; rebuild from scratch once the catalog has drifted far from them
+        old_assignment = np.empty(len(self.list_ids), dtype=np.int64)
+        old_assignment[self.list_ids] = np.repeat(np.arange(len(self.centroids)), np.diff(self.list_offsets))
+        assignment = np.empty(len(embeddings), dtype=np.int64)
+        reused = old_rows >= 0
+        assignment[reused] = old_assignment[old_rows[reused]]
+        new_rows = np.where(~reused)[0]
+        if len(new_rows):
+            assignment[new_rows] = np.argmax(np.asarray(embeddings[new_rows], dtype=np.float32) @ self.centroids.T, axis=1)
+
+        list_ids = np.argsort(assignment, kind='stable')
+        list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=len(self.centroids)))])
+        return IVFIndex(embeddings, self.centroids, list_offsets, list_ids,
+                        norms=self._patched_norms(embeddings, old_rows), n_probe=self.n_probe)
+
+    def candidates(self, query, n_probe=None):
+        query = _normalize(query)
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        ids = np.concatenate([self.list_ids[self.list_offsets[c]:self.list_offsets[c + 1]] for c in lists])
+        return np.sort(ids)
+
+    def search(self, query, k, n_probe=None):
+        ids = self.candidates(query, n_probe)
+        return top_k(ids, self.scores_for(query, ids), k)
+
+    def save(self, path, fingerprint=b''):
+        with atomic_write(path) as f:
+            np.savez(f, kind=self.kind, fingerprint=np.frombuffer(fingerprint, dtype=np.uint8), norms=self.norms,
+                     centroids=self.centroids, list_offsets=self.list_offsets, list_ids=self.list_ids,
+                     n_probe=self.n_probe)
+
+
+def build_index(embeddings, kind='ivf', **kwargs):
+    if kind == 'exact':
+        return ExactIndex(embeddings)
+    if kind == 'ivf':
+        return IVFIndex.build(embeddings, **kwargs)
+    raise ValueError(f"Unknown index kind '{kind}', expected 'exact' or 'ivf'")
+
+
+def load_index(path, embeddings, fingerprint=b''):
+    # An index is only valid for the exact rows it was built from
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as saved:
+        if saved['fingerprint'].tobytes() != fingerprint or len(saved['norms']) != len(embeddings):
+            print(f"Index at {path} was built for different embeddings, ignoring it")
+            return None
+        if str(saved['kind']) == 'ivf':
+            return IVFIndex(embeddings, saved['centroids'], saved['list_offsets'], saved['list_ids'],
+                            norms=saved['norms'], n_probe=int(saved['n_probe']))
+        return ExactIndex(embeddings, norms=saved['norms'])
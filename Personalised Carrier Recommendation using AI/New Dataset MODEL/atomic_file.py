@@ -0,0 +1,30 @@
+import os
+import shutil
+import tempfile
+import contextlib
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='wb', **kwargs):
+    """File object whose contents replace path only once the block completes.
+
+    The temp file gets a unique name next to path, so processes rebuilding the
+    same file at once (e.g. gunicorn workers booting against a stale store)
+    never write into each other's; the last rename wins and readers only
+    ever see a complete file.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        # mkstemp creates the file private, keep the permissions the target had
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,154 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import contextlib
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.metrics.pairwise import cosine_similarity
+from ann_index import ExactIndex
+from embedding_store import EmbeddingStore, HashingEmbedder, get_sentence_model, job_texts
+from synthetic_data import generate_catalog
+from structured_scoring import StructuredScorer
+from skill_index import SkillIndex
+from test_model import (
+    load_dataset, preprocess_data, generate_text_embeddings, create_suitability_labels,
+    create_user_profile, recommend_jobs, feature_row_norms, structured_similarities
+)
+
+BENCH_USER = {'interests': 'software', 'skills': 'python, machine learning', 'profession': 'engineer',
+              'expected_salary': 90000.0, 'experience': 4.0}
+
+
+def matrix_mb(X):
+    if hasattr(X, 'indptr'):
+        return (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 1e6
+    return X.nbytes / 1e6
+
+
+def measure(func, repeat):
+    # The pipeline prints debugging output, keep it out of the benchmark report
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - start)
+    return result, times
+
+
+def bench_size(rows, args, model, workdir):
+    csv_path = os.path.join(workdir, f"jobs_{rows}.csv")
+    generate_catalog(rows, n_industries=args.industries, n_skills=args.skills, seed=args.seed).to_csv(csv_path, index=False)
+    store_path = os.path.join(workdir, f"embeddings_{rows}.npy")
+    results = []
+
+    def record(stage, times, **extra):
+        entry = {'rows': rows, 'stage': stage, 'repeat': len(times), 'min_s': min(times),
+                 'mean_s': sum(times) / len(times), **extra}
+        results.append(entry)
+        print(f"{rows:>9} rows  {stage:<32} min={entry['min_s'] * 1000:10.1f} ms  mean={entry['mean_s'] * 1000:10.1f} ms")
+
+    # First call parses the CSV and writes the binary cache, later calls read the cache
+    data, times = measure(lambda: load_dataset(csv_path), 1)
+    record('load_dataset[csv]', times)
+    data, times = measure(lambda: load_dataset(csv_path), args.repeat)
+    record('load_dataset[cache]', times, memory_mb=data.memory_usage(deep=True).sum() / 1e6)
+
+    (X, preprocessor, data), times = measure(lambda: preprocess_data(data), args.repeat)
+    record('preprocess_data', times)
+
+    store = EmbeddingStore(store_path)
+    text_similarities, times = measure(lambda: generate_text_embeddings(data, BENCH_USER, store=store, model=model), 1)
+    record('generate_text_embeddings[cold]', times)
+    # Later requests reuse the index over the synced rows and only encode the user text
+    index = ExactIndex(store.sync(job_texts(data), model))
+    text_similarities, times = measure(lambda: generate_text_embeddings(data, BENCH_USER, model=model, index=index), args.repeat)
+    record('generate_text_embeddings[warm]', times)
+
+    _, times = measure(lambda: create_suitability_labels(data, BENCH_USER, text_similarities), args.repeat)
+    record('create_suitability_labels', times)
+
+    user_vector = create_user_profile(BENCH_USER, preprocessor, data)
+    x_norms = feature_row_norms(X)
+    _, times = measure(lambda: structured_similarities(user_vector, X, x_norms), args.repeat)
+    record('structured_similarity[sparse]', times, memory_mb=matrix_mb(X))
+    X_dense, dense_preprocessor, _ = preprocess_data(data, sparse=False)
+    user_dense = create_user_profile(BENCH_USER, dense_preprocessor, data)
+    _, times = measure(lambda: cosine_similarity(user_dense, X_dense), args.repeat)
+    record('structured_similarity[dense]', times, memory_mb=matrix_mb(X_dense))
+    del X_dense
+    scorer, times = measure(lambda: StructuredScorer(data, preprocessor), 1)
+    record('structured_scorer[build]', times, signatures=len(scorer))
+    _, times = measure(lambda: scorer.scores(BENCH_USER), args.repeat)
+    record('structured_similarity[lookup]', times)
+    skill_index, times = measure(lambda: SkillIndex(data), 1)
+    record('skill_index[build]', times, terms=len(skill_index),
+           memory_mb=(skill_index.row_ids.nbytes + skill_index.weights.nbytes) / 1e6)
+    _, times = measure(lambda: skill_index.search(BENCH_USER['skills'], 500), args.repeat)
+    record('skill_index[search]', times)
+
+    for scoring in args.scoring:
+        if scoring == 'forest' and rows > args.forest_max_rows:
+            print(f"{rows:>9} rows  recommend_jobs[forest] skipped above {args.forest_max_rows} rows")
+            continue
+        _, times = measure(lambda: recommend_jobs(BENCH_USER, user_vector, X, data, preprocessor, text_similarities,
+                                                  scoring=scoring), args.repeat)
+        record(f'recommend_jobs[{scoring}]', times)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each recommender stage on synthetic catalogs")
+    parser.add_argument('--rows', default='1000,10000,100000,1000000',
+                        help="Comma separated catalog sizes")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--industries', type=int, default=8)
+    parser.add_argument('--skills', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scoring', default='rules,forest', help="recommend_jobs scoring modes to run")
+    parser.add_argument('--forest-max-rows', type=int, default=100000,
+                        help="Skip the per-request RandomForest above this size, it takes minutes")
+    parser.add_argument('--real-model', action='store_true',
+                        help="Use the SentenceTransformer instead of the offline hashing embedder")
+    parser.add_argument('--workdir', help="Where generated CSVs and stores go, defaults to a temp dir")
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+    args.scoring = [mode.strip() for mode in args.scoring.split(',') if mode.strip()]
+
+    model = get_sentence_model() if args.real_model else HashingEmbedder()
+    sizes = [int(size) for size in args.rows.split(',')]
+    results = []
+    with contextlib.ExitStack() as stack:
+        workdir = args.workdir or stack.enter_context(tempfile.TemporaryDirectory(prefix='career-bench-'))
+        os.makedirs(workdir, exist_ok=True)
+        for rows in sizes:
+            results.extend(bench_size(rows, args, model, workdir))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'sklearn': sklearn.__version__,
+            'embedder': 'sentence-transformers' if args.real_model else 'hashing',
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
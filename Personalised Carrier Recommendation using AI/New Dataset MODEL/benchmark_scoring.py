@@ -0,0 +1,55 @@
+import time
+import argparse
+import numpy as np
+from embedding_store import EMBEDDINGS_PATH
+from recommender_engine import RecommenderEngine, normalize_user_input
+from test_model import DATASET_PATH, SCORING_MODES, create_user_profile, recommend_jobs
+
+SAMPLE_USERS = [
+    {'interests': 'technology', 'skills': 'programming', 'profession': 'engineer', 'expected_salary': 90000, 'experience': 4},
+    {'interests': 'software', 'skills': 'python, machine learning', 'profession': 'scientist', 'expected_salary': 120000, 'experience': 7},
+    {'interests': 'education', 'skills': 'teaching, communication', 'profession': 'teacher', 'expected_salary': 45000, 'experience': 1},
+    {'interests': 'healthcare', 'skills': 'data analysis', 'profession': 'administrator', 'expected_salary': 65000, 'experience': 3},
+    {'interests': 'finance', 'skills': 'excel, accounting', 'profession': 'developer', 'expected_salary': 70000, 'experience': 0},
+]
+
+
+def run_scoring(engine, user_input, scoring, top_n):
+    text_similarities = engine.text_similarities(user_input)
+    user_vector = create_user_profile(user_input, engine.preprocessor, engine.data)
+    start = time.perf_counter()
+    recommendations, _, _ = recommend_jobs(
+        user_input, user_vector, engine.X, engine.data, engine.preprocessor, text_similarities,
+        top_n=top_n, scoring=scoring)
+    return time.perf_counter() - start, list(recommendations.index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare latency and top-N agreement of the scoring modes")
+    parser.add_argument('--dataset', default=DATASET_PATH)
+    parser.add_argument('--embeddings', default=EMBEDDINGS_PATH)
+    parser.add_argument('--top-n', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    engine = RecommenderEngine(dataset_path=args.dataset, embeddings_path=args.embeddings)
+    latencies = {mode: [] for mode in SCORING_MODES}
+    overlaps = []
+    for user in SAMPLE_USERS:
+        user_input = normalize_user_input(user)
+        top = {}
+        for mode in SCORING_MODES:
+            for _ in range(args.repeat):
+                elapsed, top[mode] = run_scoring(engine, user_input, mode, args.top_n)
+                latencies[mode].append(elapsed)
+        overlaps.append(len(set(top['forest']) & set(top['rules'])) / args.top_n)
+
+    print(f"\nScoring benchmark over {len(engine.data)} jobs, {len(SAMPLE_USERS)} users x {args.repeat} runs")
+    for mode, values in latencies.items():
+        values = np.array(values) * 1000
+        print(f"{mode:>7}: mean={values.mean():.1f} ms, p95={np.percentile(values, 95):.1f} ms")
+    print(f"Top-{args.top_n} agreement rules vs forest: mean={np.mean(overlaps):.2f}, min={np.min(overlaps):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+from test_model import categorize_salary, experience_level_for
+
+INDEXED_COLUMNS = ['Salary Category', 'Experience Level', 'Industry', 'Location']
+REMOTE_LOCATION = 'remote'
+# CareerProfile.preferred_work_environment choices; the catalog only records a location, so
+# remote maps to the Remote location, office and field work to everything else
+ON_SITE_ENVIRONMENTS = ('office', 'fieldwork')
+
+
+class CategoryIndex:
+    """Inverted indexes over the catalog, built once per loaded dataset.
+
+    Each indexed column maps value -> sorted row ids, and salaries are kept in
+    sorted order so a salary range is two searchsorted calls. Filters
+    intersect the shortest posting lists first and the label masks for
+    create_suitability_labels are scattered from a single posting list
+    instead of comparing every row's string.
+    """
+
+    def __init__(self, data, columns=INDEXED_COLUMNS):
+        self.n_rows = len(data)
+        self.postings = {}
+        for column in columns:
+            values = pd.Categorical(np.asarray(data[column], dtype=object))
+            # A stable sort by code keeps row ids ascending inside every posting list
+            order = np.argsort(values.codes, kind='stable')
+            bounds = np.concatenate([[0], np.cumsum(np.bincount(values.codes[values.codes >= 0],
+                                                                minlength=len(values.categories)))])
+            start = int((values.codes < 0).sum())
+            self.postings[column] = {value: order[start + bounds[i]:start + bounds[i + 1]]
+                                     for i, value in enumerate(values.categories)}
+        salary = data['Salary'].to_numpy(dtype=float)
+        self.salary_order = np.argsort(salary, kind='stable')
+        self.sorted_salary = salary[self.salary_order]
+
+    def rows(self, column, values):
+        """Sorted row ids whose column holds any of values"""
+        postings = self.postings[column]
+        lists = [postings[value] for value in values if value in postings]
+        if not lists:
+            return np.empty(0, dtype=np.intp)
+        return lists[0] if len(lists) == 1 else np.sort(np.concatenate(lists))
+
+    def mask(self, column, value):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.postings[column].get(value, np.empty(0, dtype=np.intp))] = True
+        return mask
+
+    def salary_rows(self, low=None, high=None):
+        start = 0 if low is None else np.searchsorted(self.sorted_salary, low, side='left')
+        end = len(self.sorted_salary) if high is None else np.searchsorted(self.sorted_salary, high, side='right')
+        return np.sort(self.salary_order[start:end])
+
+    def match_masks(self, user_input, rows=None):
+        """Salary category and experience level masks create_suitability_labels would compute"""
+        salary_match = self.mask('Salary Category', categorize_salary(user_input['expected_salary']))
+        exp_match = self.mask('Experience Level', experience_level_for(user_input['experience']))
+        if rows is not None:
+            salary_match, exp_match = salary_match[rows], exp_match[rows]
+        return salary_match, exp_match
+
+    def _remote_locations(self):
+        return [value for value in self.postings['Location'] if str(value).lower() == REMOTE_LOCATION]
+
+    def filter_rows(self, filters):
+        """Sorted row ids passing every filter, None when nothing is filtered.
+
+        filters may hold work_environment, willing_to_relocate with
+        home_location, salary_min and salary_max, and a list of allowed
+        values under any indexed column name.
+        """
+        filters = filters or {}
+        included, excluded = [], []
+        for column in self.postings:
+            if filters.get(column):
+                included.append(self.rows(column, filters[column]))
+
+        environment = (filters.get('work_environment') or '').lower()
+        if environment == REMOTE_LOCATION:
+            included.append(self.rows('Location', self._remote_locations()))
+        elif environment in ON_SITE_ENVIRONMENTS:
+            excluded.append(self.rows('Location', self._remote_locations()))
+
+        if filters.get('willing_to_relocate') is False and filters.get('home_location'):
+            included.append(self.rows('Location', [filters['home_location']] + self._remote_locations()))
+
+        if filters.get('salary_min') is not None or filters.get('salary_max') is not None:
+            included.append(self.salary_rows(filters.get('salary_min'), filters.get('salary_max')))
+
+        if not included and not excluded:
+            return None
+        # Intersect the shortest lists first so every later step works on the smallest set
+        included.sort(key=len)
+        rows = included[0] if included else np.arange(self.n_rows)
+        for other in included[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        for other in excluded:
+            rows = np.setdiff1d(rows, other, assume_unique=True)
+        return rows
@@ -0,0 +1,209 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from atomic_file import atomic_write
+
+CACHE_VERSION = 1
+CHUNK_SIZE = 100000
+
+DEDUP_COLUMNS = ['Job Title', 'Industry', 'Required Skills']
+CATEGORICAL_COLUMNS = ['Industry', 'Location', 'Experience Level', 'Salary Category']
+PROFESSION_KEYWORDS = ['engineer', 'developer', 'programmer', 'scientist', 'teacher', 'educator', 'administrator']
+TITLE_MATCH_COLUMN = 'Title Keyword Match'
+JOB_ID_COLUMN = 'Job ID'
+ACTION_COLUMN = 'Action'
+DELTA_ACTIONS = ('add', 'change', 'remove')
+
+
+def title_keyword_mask(data):
+    pattern = '|'.join(PROFESSION_KEYWORDS)
+    return data['Job Title'].str.lower().str.contains(pattern, regex=True).to_numpy(dtype=bool)
+
+
+def salary_categories(salary):
+    # Column-wise version of test_model.categorize_salary, NaN salaries fall through to 'High' there too
+    salary = np.asarray(salary, dtype=float)
+    return np.select([salary <= 50000, salary <= 80000], ['Low', 'Medium'], default='High')
+
+
+def default_cache_path(path):
+    return os.path.splitext(path)[0] + ".cache.npz"
+
+
+def _source_key(path):
+    stat = os.stat(path)
+    return f"v{CACHE_VERSION}|{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def job_ids(data):
+    """Stable id per posting: the Job ID column when the feed has one, else a hash of the dedup key"""
+    if JOB_ID_COLUMN in data.columns:
+        return data[JOB_ID_COLUMN].astype(str).to_numpy()
+    keys = pd.util.hash_pandas_object(data[DEDUP_COLUMNS].astype(str), index=False).to_numpy()
+    return np.array([f"{key:016x}" for key in keys], dtype=object)
+
+
+def _clean_chunk(chunk, seen_keys):
+    chunk = chunk.dropna()
+    chunk['Salary'] = pd.to_numeric(chunk['Salary'], errors='coerce')
+    initial_rows = len(chunk)
+    chunk = chunk[~chunk['Job Title'].str.lower().isin(['make'])]
+    chunk = chunk.drop_duplicates(subset=DEDUP_COLUMNS)
+
+    # Duplicates can span chunks, keep the first occurrence like a single drop_duplicates would
+    keys = pd.util.hash_pandas_object(chunk[DEDUP_COLUMNS], index=False).to_numpy()
+    first_seen = np.array([key not in seen_keys for key in keys], dtype=bool)
+    seen_keys.update(keys.tolist())
+    chunk = chunk[first_seen]
+
+    chunk['Salary Category'] = salary_categories(chunk['Salary'])
+    chunk[TITLE_MATCH_COLUMN] = title_keyword_mask(chunk)
+    return chunk, initial_rows
+
+
+def read_dataset_csv(path, chunksize=CHUNK_SIZE):
+    seen_keys = set()
+    chunks = []
+    initial_rows = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk, rows = _clean_chunk(chunk, seen_keys)
+        chunks.append(chunk)
+        initial_rows += rows
+    print(f"Initial dataset size: {initial_rows} rows")
+
+    data = pd.concat(chunks, ignore_index=True)
+    for column in CATEGORICAL_COLUMNS:
+        data[column] = data[column].astype('category')
+    return data
+
+
+def apply_delta(raw, delta):
+    """Raw catalog rows with a delta applied.
+
+    delta has the catalog columns plus an Action column (add, change or
+    remove) and is keyed by job_ids. Changed rows keep their position so the
+    rest of the catalog keeps its row order; an add for an id that already
+    exists is treated as a change.
+    """
+    actions = delta[ACTION_COLUMN].str.lower().str.strip()
+    unknown = sorted(set(actions) - set(DELTA_ACTIONS))
+    if unknown:
+        raise ValueError(f"Unknown delta actions {unknown}, expected one of {DELTA_ACTIONS}")
+    delta = delta.drop(columns=ACTION_COLUMN)
+    delta_ids = job_ids(delta)
+    removed = set(delta_ids[(actions == 'remove').to_numpy()])
+    upserts = delta[(actions != 'remove').to_numpy()].set_axis(delta_ids[(actions != 'remove').to_numpy()])
+    upserts = upserts[~upserts.index.isin(removed) & ~upserts.index.duplicated(keep='last')]
+
+    raw_ids = pd.Series(job_ids(raw))
+    is_removed = raw_ids.isin(removed).to_numpy()
+    is_upserted = raw_ids.isin(upserts.index).to_numpy()
+    # A changed id keeps its first row, repeated raw rows with the same id collapse into it
+    keep = ~is_removed & ~(is_upserted & raw_ids.duplicated().to_numpy())
+    patched = raw[keep].reset_index(drop=True)
+    patched_ids = raw_ids[keep].to_numpy()
+    in_place = is_upserted[keep]
+    for column in raw.columns.intersection(upserts.columns):
+        patched.loc[in_place, column] = upserts.loc[patched_ids[in_place], column].to_numpy()
+
+    added = upserts[~upserts.index.isin(patched_ids)].reset_index(drop=True)
+    counts = {'added': len(added), 'changed': int(in_place.sum()), 'removed': int(is_removed.sum())}
+    return pd.concat([patched, added[raw.columns.intersection(added.columns)]], ignore_index=True), counts
+
+
+def clean_dataset(raw):
+    """Same cleaning and dedup as read_dataset_csv for a frame already in memory"""
+    data, _ = _clean_chunk(raw.copy(), set())
+    data = data.reset_index(drop=True)
+    for column in CATEGORICAL_COLUMNS:
+        data[column] = data[column].astype('category')
+    return data
+
+
+def encode_columns(data):
+    """Every column dictionary encoded: small integer codes plus the distinct values.
+
+    Numeric columns are kept as they are under values_<i>, the rest become
+    codes_<i> and categories_<i>. decode_columns turns the arrays back into
+    the frame.
+    """
+    arrays = {}
+    for i, column in enumerate(data.columns):
+        values = data[column]
+        if not isinstance(values.dtype, pd.CategoricalDtype) and pd.api.types.is_numeric_dtype(values.dtype):
+            arrays[f"values_{i}"] = values.to_numpy()
+        else:
+            categorical = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype('category')
+            arrays[f"codes_{i}"] = categorical.cat.codes.to_numpy()
+            arrays[f"categories_{i}"] = categorical.cat.categories.to_numpy(dtype=str)
+    return arrays
+
+
+def decode_columns(columns, arrays):
+    decoded = {}
+    for i, column in enumerate(columns):
+        if f"values_{i}" in arrays:
+            decoded[column] = arrays[f"values_{i}"]
+            continue
+        codes = arrays[f"codes_{i}"]
+        categories = arrays[f"categories_{i}"].astype(object)
+        if column in CATEGORICAL_COLUMNS:
+            decoded[column] = pd.Categorical.from_codes(codes, categories)
+        else:
+            decoded[column] = categories[codes]
+    return pd.DataFrame(decoded)
+
+
+def save_dataset_cache(data, cache_path, source_key):
+    arrays = {'source_key': np.array(source_key), 'columns': np.array(list(data.columns))}
+    arrays.update(encode_columns(data))
+
+    with atomic_write(cache_path) as f:
+        np.savez(f, **arrays)
+
+
+def load_dataset_cache(cache_path, source_key):
+    if not os.path.exists(cache_path):
+        return None
+    with np.load(cache_path) as cache:
+        if str(cache['source_key']) != source_key:
+            return None
+        return decode_columns(cache['columns'].tolist(), cache)
+
+
+def update_dataset(path, delta_path, cache_path=None):
+    """Apply a delta file to the catalog CSV and refresh its binary cache.
+
+    The CSV is rewritten atomically and re-cleaned in memory, so rows whose
+    dedup key was shadowed by a removed or changed posting come back exactly
+    as they would on a full read_dataset_csv pass.
+    """
+    raw = pd.read_csv(path)
+    patched, counts = apply_delta(raw, pd.read_csv(delta_path))
+    with atomic_write(path, 'w', newline='') as f:
+        patched.to_csv(f, index=False)
+    print(f"Catalog delta: {counts['added']} added, {counts['changed']} changed, {counts['removed']} removed")
+
+    data = clean_dataset(patched)
+    save_dataset_cache(data, cache_path or default_cache_path(path), _source_key(path))
+    return data
+
+
+def read_dataset(path, chunksize=CHUNK_SIZE, cache_path=None, use_cache=True):
+    """Cleaned job dataset, read from the binary cache when the CSV has not changed"""
+    start = time.perf_counter()
+    cache_path = cache_path or default_cache_path(path)
+    source_key = _source_key(path)
+
+    data = load_dataset_cache(cache_path, source_key) if use_cache else None
+    from_cache = data is not None
+    if data is None:
+        data = read_dataset_csv(path, chunksize)
+        if use_cache:
+            save_dataset_cache(data, cache_path, source_key)
+
+    elapsed = time.perf_counter() - start
+    memory_mb = data.memory_usage(deep=True).sum() / 1e6
+    print(f"Loaded dataset {'from cache' if from_cache else 'from CSV'} in {elapsed:.2f}s ({memory_mb:.1f} MB in memory)")
+    return data
@@ -0,0 +1,363 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import contextlib
+from collections import OrderedDict
+import numpy as np
+from atomic_file import atomic_write
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDINGS_PATH = "job_embeddings.npy"
+EMBEDDING_DTYPES = ('float32', 'float16', 'int8')
+# Rows stored at a lower precision can't be widened back without re-encoding them
+DTYPE_PRECISION = {'int8': 0, 'float16': 1, 'float32': 2}
+# Cache hits refresh last_used on disk in batches, flushed once this many are
+# pending or the oldest has waited this many seconds
+TOUCH_BATCH = 100
+TOUCH_INTERVAL = 60
+
+_models = {}
+
+
+def get_sentence_model(name=MODEL_NAME):
+    # One SentenceTransformer per process; loading the weights is the slow part
+    if name not in _models:
+        from sentence_transformers import SentenceTransformer
+        _models[name] = SentenceTransformer(name)
+    return _models[name]
+
+
+class HashingEmbedder:
+    """Offline stand-in for SentenceTransformer: hashed bag of words, no model download.
+
+    Texts sharing words get similar vectors, which is enough for benchmarks
+    and for exercising the pipeline without network access.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _token_vector(self, token):
+        seed = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, normalize_embeddings=True, **kwargs):
+        from scipy.sparse import csr_matrix
+        vocabulary = {}
+        indptr, indices = [0], []
+        for text in texts:
+            for token in text.lower().replace(',', ' ').split():
+                indices.append(vocabulary.setdefault(token, len(vocabulary)))
+            indptr.append(len(indices))
+        counts = csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                            shape=(len(texts), max(len(vocabulary), 1)))
+        token_vectors = np.zeros((max(len(vocabulary), 1), self.dim), dtype=np.float32)
+        for token, i in vocabulary.items():
+            token_vectors[i] = self._token_vector(token)
+        embeddings = np.asarray(counts @ token_vectors, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.where(norms == 0, 1.0, norms)
+
+
+def quantize(embeddings, dtype):
+    """Convert float32 rows to the on-disk format, int8 uses one symmetric scale per row"""
+    if dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"Unknown embedding dtype '{dtype}', expected one of {EMBEDDING_DTYPES}")
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if dtype == 'int8':
+        scales = np.abs(embeddings).max(axis=1)
+        scales[scales == 0] = 1.0
+        codes = np.round(embeddings / scales[:, None] * 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    return embeddings.astype(dtype), None
+
+
+def normalize_user_text(text):
+    # Inputs that differ only in case, spacing or comma style encode to the same key
+    return re.sub(r'\s*,\s*', ', ', ' '.join(str(text).lower().split()))
+
+
+class UserEmbeddingCache:
+    """Bounded LRU of user text -> embedding, so repeat profiles skip the model.
+
+    Keys are normalize_user_text of the text. With a path the entries are also
+    kept in a SQLite table, shared by every process on the host and surviving
+    restarts; namespace separates embeddings from different models there.
+    """
+
+    def __init__(self, max_entries=10000, path=None, namespace=MODEL_NAME, max_disk_entries=100000):
+        self.max_entries = max_entries
+        self.path = path
+        self.namespace = namespace
+        self.max_disk_entries = max_disk_entries
+        self.hits = self.disk_hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._connection_pid = None
+        self._writes = 0
+        self._touched = {}
+        self._touched_since = None
+
+    def _db(self):
+        # sqlite connections must not cross a fork, each worker opens its own
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS user_embeddings (namespace TEXT, text TEXT, embedding BLOB, "
+                "last_used REAL, PRIMARY KEY (namespace, text))")
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def _remember(self, key, embedding):
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, text):
+        key = normalize_user_text(text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if self.path:
+                    self._touch(key)
+                return embedding
+            if self.path:
+                row = self._db().execute("SELECT embedding FROM user_embeddings WHERE namespace = ? AND text = ?",
+                                         (self.namespace, key)).fetchone()
+                if row is not None:
+                    embedding = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, embedding)
+                    self.disk_hits += 1
+                    self._touch(key)
+                    return embedding
+            self.misses += 1
+            return None
+
+    def put(self, text, embedding):
+        key = normalize_user_text(text)
+        embedding = np.array(embedding, dtype=np.float32).ravel()
+        embedding.flags.writeable = False
+        with self._lock:
+            self._remember(key, embedding)
+            if self.path:
+                db = self._db()
+                with db:
+                    db.execute("INSERT OR REPLACE INTO user_embeddings VALUES (?, ?, ?, ?)",
+                               (self.namespace, key, embedding.tobytes(), time.time()))
+                self._touched.pop(key, None)
+                self._writes += 1
+                if self._writes % 1000 == 0:
+                    self._prune(db)
+        return embedding
+
+    def _touch(self, key):
+        # Without this _prune would evict by insertion time, dropping the profiles hit most
+        now = time.time()
+        self._touched[key] = now
+        if self._touched_since is None:
+            self._touched_since = now
+        if len(self._touched) >= TOUCH_BATCH or now - self._touched_since >= TOUCH_INTERVAL:
+            self._flush_touched(self._db())
+
+    def _flush_touched(self, db):
+        if self._touched:
+            with db:
+                db.executemany("UPDATE user_embeddings SET last_used = ? WHERE namespace = ? AND text = ?",
+                               [(used, self.namespace, key) for key, used in self._touched.items()])
+        self._touched.clear()
+        self._touched_since = None
+
+    def _prune(self, db):
+        self._flush_touched(db)
+        with db:
+            db.execute("DELETE FROM user_embeddings WHERE namespace = ? AND text NOT IN (SELECT text FROM "
+                       "user_embeddings WHERE namespace = ? ORDER BY last_used DESC LIMIT ?)",
+                       (self.namespace, self.namespace, self.max_disk_entries))
+
+    def encode(self, model, texts, **kwargs):
+        """Embeddings for texts, only distinct texts not cached go through model.encode (as one batch)"""
+        keys = [normalize_user_text(text) for text in texts]
+        embeddings = [self.get(key) for key in keys]
+        missing = list(dict.fromkeys(key for key, embedding in zip(keys, embeddings) if embedding is None))
+        if missing:
+            encoded = {key: self.put(key, embedding) for key, embedding in zip(missing, model.encode(missing, **kwargs))}
+            embeddings = [encoded[key] if embedding is None else embedding for key, embedding in zip(keys, embeddings)]
+        return np.vstack(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'entries': len(self._entries)}
+
+
+class QuantizedEmbeddings:
+    """Read-only float32 view over float16 or int8 rows.
+
+    Supports the operations the indexes use (len, shape, row indexing and
+    matrix products); rows are dequantized a chunk at a time so a full float32
+    copy of the catalog is never materialized.
+    """
+
+    def __init__(self, codes, scales=None, chunk_size=65536):
+        self.codes = codes
+        self.scales = scales
+        self.chunk_size = chunk_size
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def dtype(self):
+        return self.codes.dtype
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + (0 if self.scales is None else self.scales.nbytes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, key):
+        rows = np.asarray(self.codes[key], dtype=np.float32)
+        if self.scales is not None:
+            rows *= (np.asarray(self.scales[key], dtype=np.float32) / 127)[..., None]
+        return rows
+
+    def __array__(self, dtype=None, copy=None):
+        # Full dequantized copy, only for callers that really need a dense matrix
+        return self[:] if dtype is None else self[:].astype(dtype)
+
+    def __matmul__(self, other):
+        other = np.asarray(other, dtype=np.float32)
+        out = np.empty((len(self),) + other.shape[1:], dtype=np.float32)
+        for start in range(0, len(self), self.chunk_size):
+            out[start:start + self.chunk_size] = self[start:start + self.chunk_size] @ other
+        return out
+
+
+def job_texts(data):
+    # Industry is categorical once loaded, cast before concatenating
+    return data['Job Title'].astype(str) + " " + data['Industry'].astype(str) + " " + data['Required Skills'].astype(str)
+
+
+def hash_texts(texts):
+    return np.array([hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest() for text in texts], dtype='S16')
+
+
+def match_rows(old_hashes, hashes):
+    """Row of each hash in old_hashes, -1 where the text is new"""
+    lookup = {} if old_hashes is None else {h: i for i, h in enumerate(old_hashes)}
+    return np.array([lookup.get(h, -1) for h in hashes], dtype=np.int64)
+
+
+class EmbeddingStore:
+    """Job embeddings on disk, one row per job, addressed by a hash of the job text.
+
+    The matrix is memory mapped read-only on load, so worker processes share
+    its pages, and only rows whose text is not already in the store are sent
+    through the sentence model on sync. dtype picks the on-disk format
+    (float32, float16 or int8); None keeps whatever the store already uses.
+    """
+
+    def __init__(self, path=EMBEDDINGS_PATH, dtype=None):
+        if dtype is not None and dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unknown embedding dtype '{dtype}', expected one of {EMBEDDING_DTYPES}")
+        self.path = path
+        self.hashes_path = os.path.splitext(path)[0] + "_hashes.npy"
+        self.scales_path = os.path.splitext(path)[0] + "_scales.npy"
+        self.dtype = dtype
+        self.stored_dtype = None
+        self.embeddings = None
+        self.hashes = None
+
+    def load(self):
+        if not (os.path.exists(self.path) and os.path.exists(self.hashes_path)):
+            return None
+        embeddings = np.load(self.path, mmap_mode='r')
+        hashes = np.load(self.hashes_path)
+        if embeddings.ndim != 2 or len(embeddings) != len(hashes):
+            print(f"Embedding store at {self.path} is inconsistent, ignoring it")
+            return None
+        stored_dtype = str(embeddings.dtype)
+        if stored_dtype == 'int8':
+            if not os.path.exists(self.scales_path):
+                print(f"Embedding store at {self.path} is missing its int8 scales, ignoring it")
+                return None
+            embeddings = QuantizedEmbeddings(embeddings, np.load(self.scales_path, mmap_mode='r'))
+        elif stored_dtype == 'float16':
+            embeddings = QuantizedEmbeddings(embeddings)
+        self.embeddings, self.hashes, self.stored_dtype = embeddings, hashes, stored_dtype
+        return embeddings
+
+    def fingerprint(self):
+        # Identifies the exact rows in the store, derived artifacts like the ANN index record it
+        digest = hashlib.blake2b(self.hashes.tobytes(), digest_size=16)
+        if self.stored_dtype not in (None, 'float32'):
+            digest.update(self.stored_dtype.encode('ascii'))
+        return digest.digest()
+
+    def sync(self, texts, model):
+        texts = list(texts)
+        hashes = hash_texts(texts)
+        if self.embeddings is None:
+            self.load()
+
+        if (self.hashes is not None and np.array_equal(self.hashes, hashes)
+                and self.dtype in (None, self.stored_dtype)):
+            return self.embeddings
+
+        old_hashes = self.hashes
+        if (self.dtype is not None and self.stored_dtype is not None
+                and DTYPE_PRECISION[self.dtype] > DTYPE_PRECISION[self.stored_dtype]):
+            print(f"Embedding store: {self.stored_dtype} rows can't be widened to {self.dtype}, encoding every row")
+            old_hashes = None
+        old_rows = match_rows(old_hashes, hashes)
+        missing = np.where(old_rows < 0)[0]
+        print(f"Embedding store: {len(texts) - len(missing)} rows reused, {len(missing)} rows to encode")
+
+        new_embeddings = None
+        if len(missing):
+            new_embeddings = np.asarray(
+                model.encode([texts[i] for i in missing], show_progress_bar=len(missing) > 1000),
+                dtype=np.float32)
+        dim = new_embeddings.shape[1] if new_embeddings is not None else self.embeddings.shape[1]
+
+        embeddings = np.empty((len(texts), dim), dtype=np.float32)
+        reused = np.where(old_rows >= 0)[0]
+        if len(reused):
+            embeddings[reused] = self.embeddings[old_rows[reused]]
+        if new_embeddings is not None:
+            embeddings[missing] = new_embeddings
+
+        # Drop the old memory map before replacing the file underneath it
+        dtype = self.dtype or self.stored_dtype or 'float32'
+        self.embeddings = self.hashes = None
+        self._write(embeddings, hashes, dtype)
+        return self.load()
+
+    def _write(self, embeddings, hashes, dtype='float32'):
+        codes, scales = quantize(embeddings, dtype)
+        files = [(self.path, codes), (self.hashes_path, hashes)]
+        if scales is not None:
+            files.insert(0, (self.scales_path, scales))
+        else:
+            # Another process syncing the same store may have removed it already
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.scales_path)
+        # Write to temp files and rename so readers never see a half written matrix
+        for path, array in files:
+            with atomic_write(path) as f:
+                np.save(f, array)
@@ -0,0 +1,103 @@
+import io
+import os
+import sys
+import argparse
+import tempfile
+import contextlib
+import numpy as np
+from ann_index import ExactIndex
+from benchmark_scoring import SAMPLE_USERS
+from embedding_store import (EMBEDDINGS_PATH, EMBEDDING_DTYPES, EmbeddingStore, HashingEmbedder,
+                             QuantizedEmbeddings, get_sentence_model, job_texts, quantize)
+from synthetic_data import generate_catalog
+from dataset_loader import clean_dataset
+from test_model import DATASET_PATH, build_user_text, load_dataset
+
+
+# A float32 store whose rows were once quantized (e.g. widened from int8 before sync re-encoded
+# on widening) differs from a fresh encode by about 1e-3, far above the model's own noise
+REFERENCE_TOLERANCE = 1e-4
+
+
+def is_clean_reference(embeddings, texts, model, sample=64, seed=0):
+    """Whether stored float32 rows match a fresh encode of a sample of their texts"""
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(texts), size=min(sample, len(texts)), replace=False))
+    fresh = np.asarray(model.encode([texts[i] for i in rows], show_progress_bar=False), dtype=np.float32)
+    return np.abs(np.asarray(embeddings[rows], dtype=np.float32) - fresh).max() <= REFERENCE_TOLERANCE
+
+
+def float32_embeddings(texts, model, path, workdir):
+    # Reuse the real store when it already holds float32 rows, otherwise encode into a scratch one
+    store = EmbeddingStore(path)
+    if store.load() is not None and store.stored_dtype == 'float32':
+        embeddings = store.sync(texts, model)
+        if is_clean_reference(embeddings, texts, model):
+            return embeddings
+        print(f"Embedding store at {path} holds previously quantized rows, not using it as the float32 reference",
+              file=sys.stderr)
+    return EmbeddingStore(os.path.join(workdir, "float32.npy"), dtype='float32').sync(texts, model)
+
+
+def query_embeddings(texts, model, n_queries, seed):
+    # The sample users plus job texts drawn from the catalog, which sit in dense regions and
+    # are the hardest case for keeping the exact top-N order
+    rng = np.random.default_rng(seed)
+    queries = [build_user_text(user) for user in SAMPLE_USERS]
+    picks = rng.choice(len(texts), size=min(n_queries, len(texts)), replace=False)
+    queries += [texts[i] for i in picks]
+    return np.asarray(model.encode(queries, show_progress_bar=False), dtype=np.float32)
+
+
+def evaluate(baseline, queries, dtype, top_n):
+    codes, scales = quantize(baseline, dtype)
+    embeddings = codes if dtype == 'float32' else QuantizedEmbeddings(codes, scales)
+    exact, index = ExactIndex(baseline), ExactIndex(embeddings)
+    overlaps, errors = [], []
+    for query in queries:
+        expected, expected_scores = exact.search(query, top_n)
+        found, _ = index.search(query, top_n)
+        overlaps.append(len(set(expected) & set(found)) / len(expected))
+        errors.append(np.abs(index.scores_for(query, expected) - expected_scores).max())
+    memory_mb = (codes.nbytes + (0 if scales is None else scales.nbytes)) / 1e6
+    return memory_mb, np.array(overlaps), np.array(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top-N overlap and memory of quantized job embeddings against float32")
+    parser.add_argument('--dataset', default=DATASET_PATH)
+    parser.add_argument('--embeddings', default=EMBEDDINGS_PATH)
+    parser.add_argument('--synthetic-rows', type=int,
+                        help="Evaluate on a generated catalog of this size instead of --dataset")
+    parser.add_argument('--hashing', action='store_true',
+                        help="Use the offline hashing embedder instead of the SentenceTransformer")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    model = HashingEmbedder() if args.hashing else get_sentence_model()
+    with tempfile.TemporaryDirectory(prefix='career-quant-') as workdir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if args.synthetic_rows:
+                # Cleaned and renumbered like load_dataset does for the CSV
+                data = clean_dataset(generate_catalog(args.synthetic_rows, seed=args.seed))
+                embeddings_path = os.path.join(workdir, "synthetic.npy")
+            else:
+                data = load_dataset(args.dataset)
+                embeddings_path = args.embeddings
+            # Sampled by position below, not by index label
+            texts = job_texts(data).to_numpy()
+            baseline = np.asarray(float32_embeddings(texts, model, embeddings_path, workdir), dtype=np.float32)
+        queries = query_embeddings(texts, model, args.queries, args.seed)
+
+    print(f"Quantization report over {len(baseline)} jobs x {baseline.shape[1]} dims, "
+          f"{len(queries)} queries, top-{args.top_n}")
+    for dtype in EMBEDDING_DTYPES:
+        memory_mb, overlaps, errors = evaluate(baseline, queries, dtype, args.top_n)
+        print(f"{dtype:>8}: {memory_mb:9.1f} MB  overlap mean={overlaps.mean():.4f} min={overlaps.min():.2f}  "
+              f"max score error={errors.max():.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import numpy as np
+import scipy.sparse as sp
+import joblib
+from atomic_file import atomic_write
+from dataset_loader import encode_columns, decode_columns, _source_key
+from embedding_store import EmbeddingStore, MODEL_NAME
+from ann_index import load_index
+
+BUNDLE_FORMAT = 1
+BUNDLE_DIR = os.environ.get("CAREER_BUNDLE_DIR", "model_bundles")
+# Keep a few older versions so a process still memory mapping one isn't pulled from under it
+KEEP_VERSIONS = 3
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+DATASET_DIR = "dataset"
+FEATURES_DIR = "features"
+PREPROCESSOR_FILE = "preprocessor.joblib"
+EMBEDDINGS_FILE = "job_embeddings.npy"
+INDEX_FILE = "job_index.npz"
+MODEL_FILE = "predicting_model.pkl"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_info(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'bytes': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+            'blake2b': file_digest(path)}
+
+
+def source_matches(source, path):
+    """True when the CSV at path is the one the bundle was built from.
+
+    An unchanged size and mtime is taken as a match like the dataset cache
+    does, anything else (a copied or touched file) is settled by hashing it.
+    """
+    stat = os.stat(path)
+    if (os.path.abspath(path) == source['path'] and stat.st_size == source['bytes']
+            and stat.st_mtime_ns == source['mtime_ns']):
+        return True
+    return stat.st_size == source['bytes'] and file_digest(path) == source['blake2b']
+
+
+def _save(path, array):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, np.ascontiguousarray(array))
+
+
+def _link_or_copy(src, dst):
+    # The store replaces its files by rename, so a hard link keeps this version's bytes
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def write_bundle(root, dataset_path, data, X, preprocessor, store, index, model_path=None,
+                 embedding_model=MODEL_NAME, keep=KEEP_VERSIONS):
+    """Write every artifact the engine loads as a new bundle version under root.
+
+    The version is assembled in a temp directory, renamed into place and only
+    then made current by rewriting root/CURRENT, so readers see either the old
+    bundle or the complete new one. Returns the version directory.
+    """
+    source = source_info(dataset_path)
+    version = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime()) + '-' + source['blake2b'][:8]
+    os.makedirs(root, exist_ok=True)
+    if os.path.exists(os.path.join(root, version)):
+        # Rebuilt from the same CSV within the same second
+        version += f"-{len(list_versions(root))}"
+    tmp_dir = os.path.join(root, f".tmp-{version}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # Dataset columns and the feature matrix as plain .npy files so they can be memory mapped
+    for name, array in encode_columns(data).items():
+        _save(os.path.join(tmp_dir, DATASET_DIR, f"{name}.npy"), array)
+    if sp.issparse(X):
+        X = X.tocsr()
+        for name in ('data', 'indices', 'indptr'):
+            _save(os.path.join(tmp_dir, FEATURES_DIR, f"{name}.npy"), getattr(X, name))
+    else:
+        _save(os.path.join(tmp_dir, FEATURES_DIR, "dense.npy"), X)
+    joblib.dump(preprocessor, os.path.join(tmp_dir, PREPROCESSOR_FILE))
+
+    bundle_store = EmbeddingStore(os.path.join(tmp_dir, EMBEDDINGS_FILE))
+    for src, dst in ((store.path, bundle_store.path), (store.hashes_path, bundle_store.hashes_path),
+                     (store.scales_path, bundle_store.scales_path)):
+        if os.path.exists(src):
+            _link_or_copy(src, dst)
+    index.save(os.path.join(tmp_dir, INDEX_FILE), fingerprint=store.fingerprint())
+    if model_path and os.path.exists(model_path):
+        _link_or_copy(model_path, os.path.join(tmp_dir, MODEL_FILE))
+
+    files = {}
+    for directory, _, names in os.walk(tmp_dir):
+        for name in sorted(names):
+            path = os.path.join(directory, name)
+            files[os.path.relpath(path, tmp_dir).replace(os.sep, '/')] = {
+                'bytes': os.path.getsize(path), 'blake2b': file_digest(path)}
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'version': version,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'source': source,
+        'rows': len(data),
+        'columns': list(data.columns),
+        'features_shape': list(X.shape),
+        'embedding_model': embedding_model,
+        'embedding_dtype': store.stored_dtype or 'float32',
+        'embedding_fingerprint': store.fingerprint().hex(),
+        'index_kind': index.kind,
+        'files': files,
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    path = os.path.join(root, version)
+    os.replace(tmp_dir, path)
+    with atomic_write(os.path.join(root, CURRENT_FILE), 'w') as f:
+        f.write(version + "\n")
+    prune_bundles(root, keep)
+    print(f"Published model bundle {version} ({len(data)} jobs) to {root}")
+    return path
+
+
+def list_versions(root):
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root)
+                  if os.path.exists(os.path.join(root, name, MANIFEST_FILE)))
+
+
+def current_version(root):
+    """Version named by root/CURRENT, None when nothing has been published"""
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def source_version(dataset_path):
+    """Catalog version of a CSV served without a bundle, changes whenever the file does"""
+    return hashlib.blake2b(_source_key(dataset_path).encode(), digest_size=8).hexdigest()
+
+
+def catalog_version(root, dataset_path):
+    """Version of the catalog results are served from, without loading anything.
+
+    The current bundle under root, else source_version of the CSV; the same
+    value RecommenderEngine.catalog_version takes, so a process that hasn't
+    built its engine yet can still tell whether cached results are current.
+    None when neither exists.
+    """
+    version = current_version(root) if root else None
+    if version is None and os.path.exists(dataset_path):
+        version = source_version(dataset_path)
+    return version
+
+
+def prune_bundles(root, keep=KEEP_VERSIONS):
+    current = current_version(root)
+    old = [v for v in list_versions(root) if v != current]
+    for version in old[:max(0, len(old) - keep + 1)]:
+        shutil.rmtree(os.path.join(root, version), ignore_errors=True)
+
+
+def resolve_bundle(path):
+    """A bundle version directory, or the current version when path is a bundle root"""
+    if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        return path
+    version = current_version(path)
+    return os.path.join(path, version) if version else None
+
+
+class ModelBundle:
+    """One loaded bundle version.
+
+    Dataset codes, the feature matrix and the embeddings are memory mapped
+    read-only, so loading costs little more than reading the manifest and
+    the preprocessor and every process serving the same version shares the
+    pages.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest['version']
+
+        dataset_dir = os.path.join(path, DATASET_DIR)
+        arrays = {os.path.splitext(name)[0]: np.load(os.path.join(dataset_dir, name), mmap_mode='r')
+                  for name in os.listdir(dataset_dir)}
+        self.data = decode_columns(self.manifest['columns'], arrays)
+
+        features_dir = os.path.join(path, FEATURES_DIR)
+        if os.path.exists(os.path.join(features_dir, "dense.npy")):
+            self.X = np.load(os.path.join(features_dir, "dense.npy"), mmap_mode='r')
+        else:
+            self.X = sp.csr_matrix(tuple(np.load(os.path.join(features_dir, f"{name}.npy"), mmap_mode='r')
+                                         for name in ('data', 'indices', 'indptr')),
+                                   shape=tuple(self.manifest['features_shape']), copy=False)
+        self.preprocessor = joblib.load(os.path.join(path, PREPROCESSOR_FILE))
+
+        self.store = EmbeddingStore(os.path.join(path, EMBEDDINGS_FILE))
+        self.embeddings = self.store.load()
+        self.index = load_index(os.path.join(path, INDEX_FILE), self.embeddings, self.store.fingerprint())
+        self._predicting_model = None
+
+    @property
+    def predicting_model(self):
+        """The RandomForest prepare_datamodel.py trains, loaded on first use"""
+        if self._predicting_model is None and os.path.exists(os.path.join(self.path, MODEL_FILE)):
+            self._predicting_model = joblib.load(os.path.join(self.path, MODEL_FILE), mmap_mode='r')
+        return self._predicting_model
+
+
+def check_bundle(path, dataset_path=None, model_name=None, verify=False):
+    """Problems that make the bundle at path unusable, an empty list when it is fine.
+
+    Files are checked against the manifest sizes, or with verify against
+    their hashes as well. dataset_path, when the CSV is present, must be the
+    file the bundle was built from and model_name the sentence model its
+    embeddings came from.
+    """
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != BUNDLE_FORMAT:
+        return [f"bundle format {manifest.get('format')} is not {BUNDLE_FORMAT}"]
+
+    problems = []
+    for name, expected in manifest['files'].items():
+        file_path = os.path.join(path, name)
+        if not os.path.exists(file_path):
+            problems.append(f"{name} is missing")
+        elif os.path.getsize(file_path) != expected['bytes'] or (verify and file_digest(file_path) != expected['blake2b']):
+            problems.append(f"{name} does not match the manifest")
+    if model_name is not None and model_name != manifest['embedding_model']:
+        problems.append(f"embeddings are from {manifest['embedding_model']}, not {model_name}")
+    if dataset_path is not None and os.path.exists(dataset_path) and not source_matches(manifest['source'], dataset_path):
+        problems.append(f"{dataset_path} is not the CSV the bundle was built from")
+    return problems
+
+
+def load_bundle(path, dataset_path=None, model_name=None, verify=False):
+    """Load a bundle version (or the current one under a bundle root), None if there is no usable bundle"""
+    path = resolve_bundle(path)
+    if path is None or not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        return None
+    problems = check_bundle(path, dataset_path, model_name, verify)
+    if problems:
+        print(f"Model bundle at {path} is not usable, ignoring it: {'; '.join(problems)}")
+        return None
+    bundle = ModelBundle(path)
+    if bundle.embeddings is None or bundle.index is None:
+        print(f"Model bundle at {path} has inconsistent embeddings, ignoring it")
+        return None
+    return bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and check the published model bundles")
+    parser.add_argument('--root', default=BUNDLE_DIR)
+    parser.add_argument('--dataset', default=None, help="Source CSV to check the current bundle against")
+    parser.add_argument('--verify', action='store_true', help="Hash every file against the manifest")
+    args = parser.parse_args()
+
+    current = current_version(args.root)
+    for version in list_versions(args.root):
+        with open(os.path.join(args.root, version, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        size_mb = sum(entry['bytes'] for entry in manifest['files'].values()) / 1e6
+        print(f"{'*' if version == current else ' '} {version}  {manifest['rows']} jobs  "
+              f"{manifest['embedding_model']} {manifest['embedding_dtype']}  {size_mb:.1f} MB")
+    if current is None:
+        print(f"No model bundle published under {args.root}")
+        return
+
+    start = time.perf_counter()
+    bundle = load_bundle(args.root, args.dataset, verify=args.verify)
+    if bundle is not None:
+        print(f"Loaded {bundle.version} in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,60 @@
-import pandas as pd
+import os
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 import joblib
-
-# Load dataset
-data = pd.read_csv(r"C:/Users/metro/Desktop/UDP 7th Sem/Personalised Carrier Recommendation using AI/New Dataset MODEL/New Dataset/job_recommendation_dataset.csv")
-
-# Load model once
-model = SentenceTransformer('all-MiniLM-L6-v2')
-
-# Create job descriptions
-job_texts = data['Job Title'] + " " + data['Industry'] + " " + data['Required Skills']
-
-# Compute embeddings once
-job_embeddings = model.encode(job_texts.tolist(), show_progress_bar=True)
-
-# Save embeddings
-np.save("job_embeddings.npy", job_embeddings)
-
-# ---- Optional: Train RandomForest only once ----
-X = job_embeddings
-y = data["Industry"]  # or any label column you want to predict
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-clf = RandomForestClassifier(n_estimators=100, random_state=42)
-clf.fit(X_train, y_train)
-
-# Save trained model
-joblib.dump(clf, "predicting_model.pkl")
-
-print("Preprocessing complete. Embeddings + Model saved.")
+from embedding_store import EmbeddingStore, MODEL_NAME, get_sentence_model, job_texts
+from sharded_encoder import ShardedEncoder
+from ann_index import INDEX_PATH, build_index
+from test_model import DATASET_PATH, load_dataset, preprocess_data
+from model_bundle import BUNDLE_DIR, write_bundle
+
+
+def main():
+    # Load the cleaned dataset so stored rows line up with what test_model.py scores
+    data = load_dataset()
+
+    # CAREER_EMBEDDING_WORKERS > 1 encodes shards in a process pool; an interrupted
+    # build resumes from the shards already written to embedding_shards/
+    workers = int(os.environ.get("CAREER_EMBEDDING_WORKERS", "1"))
+    if workers > 1:
+        model = ShardedEncoder(workers=workers, batch_size=int(os.environ.get("CAREER_EMBEDDING_BATCH_SIZE", "128")))
+    else:
+        # Load model once
+        model = get_sentence_model()
+
+    # Compute embeddings once, rows already in job_embeddings.npy are reused.
+    # CAREER_EMBEDDING_DTYPE=float16 or int8 stores them quantized (2x / 4x smaller)
+    store = EmbeddingStore(dtype=os.environ.get("CAREER_EMBEDDING_DTYPE") or None)
+    job_embeddings = store.sync(job_texts(data), model)
+    if isinstance(model, ShardedEncoder):
+        model.clear()
+
+    # Build the top-K index next to the embeddings so requests don't scan every job
+    index = build_index(job_embeddings, kind='ivf')
+    index.save(INDEX_PATH, fingerprint=store.fingerprint())
+
+    # ---- Optional: Train RandomForest only once ----
+    X = np.asarray(job_embeddings)
+    y = data["Industry"]  # or any label column you want to predict
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    clf = RandomForestClassifier(n_estimators=100, random_state=42)
+    clf.fit(X_train, y_train)
+
+    # Save trained model
+    joblib.dump(clf, "predicting_model.pkl")
+
+    # Publish everything the engine loads as one versioned bundle tied to this CSV, running
+    # servers pick it up without a restart (see RECOMMENDER_BUNDLE_DIR in the web app)
+    X_features, preprocessor, data = preprocess_data(data)
+    model_name = model.model_name if isinstance(model, ShardedEncoder) else MODEL_NAME
+    write_bundle(BUNDLE_DIR, DATASET_PATH, data, X_features, preprocessor, store, index,
+                 model_path="predicting_model.pkl", embedding_model=model_name)
+
+    print("Preprocessing complete. Embeddings + Model saved.")
+
+
+# Guarded so the encoder's worker processes can import this module without re-running the build
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import numpy as np
+
+
+def top_k_indices(scores, k):
+    """Positions of the k largest scores, best first.
+
+    Runs in O(n + k log k) with argpartition instead of sorting the whole
+    array. Ties are broken towards the lower position, so the result equals
+    np.argsort(-scores, kind='stable')[:k] whatever the order argpartition
+    leaves equal scores in.
+    """
+    scores = np.asarray(scores)
+    n = len(scores)
+    k = max(0, min(k, n))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        # The k-th largest value; everything above it is in, ties on it are taken by position
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        if threshold != threshold:
+            # NaN scores rank last, as they do in argsort
+            above = np.flatnonzero(scores == scores)
+            tied = np.flatnonzero(scores != scores)[:k - len(above)]
+        else:
+            above = np.flatnonzero(scores > threshold)
+            tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+        selected = np.concatenate([above, tied])
+    else:
+        selected = np.arange(n)
+    return selected[np.lexsort((selected, -scores[selected]))]
+
+
+def top_k(ids, scores, k):
+    """The k best (id, score) pairs, best first, ties going to the earlier entry"""
+    order = top_k_indices(scores, k)
+    return ids[order], scores[order]
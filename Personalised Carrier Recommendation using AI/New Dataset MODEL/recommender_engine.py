@@ -0,0 +1,241 @@
+import time
+import numpy as np
+from embedding_store import (EmbeddingStore, EMBEDDINGS_PATH, MODEL_NAME, UserEmbeddingCache, get_sentence_model,
+                             job_texts)
+from ann_index import INDEX_PATH, IVFIndex, build_index, load_index
+from structured_scoring import StructuredScorer
+from category_index import CategoryIndex
+from skill_index import SkillIndex
+from model_bundle import load_bundle, source_version
+from test_model import (
+    DATASET_PATH, load_dataset, preprocess_data, build_user_text, recommend_jobs, get_user_input
+)
+
+# recommend() gathers embedding rows for candidate sets up to this share of the catalog,
+# larger ones (e.g. a work environment filter) are cheaper to score in one full scan
+GATHER_FRACTION = 0.1
+
+RESULT_COLUMNS = {
+    'Job Title': 'job_title',
+    'Company': 'company',
+    'Location': 'location',
+    'Experience Level': 'experience_level',
+    'Salary': 'salary',
+    'Salary Category': 'salary_category',
+    'Industry': 'industry',
+    'Required Skills': 'required_skills',
+}
+
+
+def normalize_user_input(user_input):
+    # Same cleaning get_user_input applies to what is typed at the prompt
+    def as_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    return {
+        'interests': str(user_input.get('interests') or '').lower().strip(),
+        'skills': str(user_input.get('skills') or '').lower().strip(),
+        'profession': str(user_input.get('profession') or '').lower().strip(),
+        'expected_salary': as_float(user_input.get('expected_salary')),
+        'experience': as_float(user_input.get('experience')),
+    }
+
+
+class RecommenderEngine:
+    """Dataset, fitted preprocessor, job embeddings and sentence model loaded once per process.
+
+    Build it once (e.g. at import time under gunicorn --preload) and call
+    recommend() for every user.
+    """
+
+    def __init__(self, dataset_path=DATASET_PATH, embeddings_path=EMBEDDINGS_PATH, model=None, scoring='forest',
+                 index_path=INDEX_PATH, candidate_k=None, user_cache_size=10000, user_cache_path=None,
+                 lexical_k=None, lexical_weight=0.0, bundle_path=None, user_cache=None):
+        self.scoring = scoring
+        # When set, only the candidate_k nearest jobs from the IVF index are scored
+        self.candidate_k = candidate_k
+        # lexical_k adds the best BM25 skill matches to the candidates (and alone replaces
+        # the dense scan); lexical_weight blends the BM25 score into the text similarity
+        self.lexical_k = lexical_k
+        self.lexical_weight = lexical_weight
+        self.model = model or get_sentence_model()
+        model_name = getattr(self.model, 'name', MODEL_NAME)
+        # A published bundle (see model_bundle.py) replaces the CSV read, the preprocessor fit and
+        # the embedding sync with memory mapped arrays; without a usable one everything is rebuilt
+        bundle = load_bundle(bundle_path, dataset_path, model_name) if bundle_path else None
+        self.bundle_version = bundle.version if bundle is not None else None
+        # Identifies the catalog results come from, so callers caching results can tell a swap or
+        # a catalog delta made them stale; model_bundle.catalog_version gives the same without an engine
+        self.catalog_version = self.bundle_version or source_version(dataset_path)
+        if bundle is not None:
+            self.X, self.preprocessor, self.data = bundle.X, bundle.preprocessor, bundle.data
+        else:
+            data = load_dataset(dataset_path)
+            self.X, self.preprocessor, self.data = preprocess_data(data)
+        # Per-signature lookup tables replace the per-request cosine over one-hot rows
+        self.structured = StructuredScorer(self.data, self.preprocessor)
+        # value -> row id posting lists for the label masks and the profile filters
+        self.category_index = CategoryIndex(self.data)
+        self.skill_index = SkillIndex(self.data) if lexical_k or lexical_weight else None
+        # Repeat user texts skip the model; user_cache_path adds a SQLite copy shared across processes.
+        # Pass the previous engine's cache when swapping in a new bundle for the same model
+        self.user_cache = user_cache or UserEmbeddingCache(max_entries=user_cache_size, path=user_cache_path,
+                                                           namespace=model_name)
+        if bundle is not None:
+            self.store, self.job_embeddings, self.index = bundle.store, bundle.embeddings, bundle.index
+            if candidate_k and not isinstance(self.index, IVFIndex):
+                self.index = build_index(self.job_embeddings, kind='ivf')
+        else:
+            self.store = EmbeddingStore(embeddings_path)
+            self.job_embeddings = self.store.sync(job_texts(self.data), self.model)
+            self.index = load_index(index_path, self.job_embeddings, self.store.fingerprint())
+            if self.index is None:
+                self.index = build_index(self.job_embeddings, kind='ivf' if candidate_k else 'exact')
+
+    def encode_user(self, user_input):
+        return self.user_cache.encode(self.model, [build_user_text(user_input)], show_progress_bar=False)[0]
+
+    def text_similarities(self, user_input):
+        return self.index.scores(self.encode_user(user_input))
+
+    def recommend(self, user_input, top_n=5, scoring=None, timings=None, filters=None):
+        """Top jobs for one user.
+
+        filters restricts the catalog before scoring, see
+        CategoryIndex.filter_rows for the keys. Pass a dict as timings to get
+        per-stage seconds back under 'encode', 'similarity', 'scoring' and
+        'ranking'.
+        """
+        timings = {} if timings is None else timings
+        user_input = normalize_user_input(user_input)
+        start = time.perf_counter()
+        user_embedding = self.encode_user(user_input)
+        encoded = time.perf_counter()
+        candidates = self.category_index.filter_rows(filters)
+        retrieved = self._retrieve(user_input, user_embedding)
+        if retrieved is not None:
+            candidates = retrieved if candidates is None else np.intersect1d(candidates, retrieved, assume_unique=True)
+        if candidates is None:
+            text_similarities = self.index.scores(user_embedding)
+        elif not len(candidates):
+            return []
+        elif len(candidates) <= GATHER_FRACTION * len(self.data):
+            text_similarities = self.index.scores_for(user_embedding, candidates)
+        else:
+            # Gathering most of the embedding matrix costs more than the dot product it saves
+            text_similarities = self.index.scores(user_embedding)[candidates]
+        text_similarities = self._hybrid(user_input, text_similarities, candidates)
+        timings['encode'] = encoded - start
+        timings['similarity'] = time.perf_counter() - encoded
+        return self._rank(user_input, text_similarities, top_n, scoring, candidates, timings)
+
+    def _retrieve(self, user_input, user_embedding):
+        """Sorted candidate rows from the ANN and skill indexes, None to scan the whole catalog"""
+        retrieved = []
+        if self.candidate_k and isinstance(self.index, IVFIndex):
+            retrieved.append(self.index.search(user_embedding, self.candidate_k)[0])
+        if self.lexical_k:
+            lexical, _ = self.skill_index.search(user_input['skills'], self.lexical_k)
+            # No skill overlap at all says nothing about the user, fall back to the dense candidates
+            if len(lexical):
+                retrieved.append(lexical)
+        if not retrieved:
+            return None
+        return np.unique(np.concatenate(retrieved))
+
+    def _hybrid(self, user_input, text_similarities, candidates=None):
+        if not self.lexical_weight:
+            return text_similarities
+        lexical = self.skill_index.scores(user_input['skills'], candidates)
+        return (1 - self.lexical_weight) * text_similarities + self.lexical_weight * lexical
+
+    def recommend_batch(self, user_inputs, top_n=5, scoring=None, batch_size=64, max_chunk_bytes=256 * 1024 * 1024,
+                        filters=None):
+        """Recommendations for many users, one list of results per input.
+
+        User texts are encoded in batches and text similarities are computed
+        a chunk of users at a time so the users x jobs matrix stays under
+        max_chunk_bytes. filters, when given, holds one filters dict per user.
+        The whole catalog is scored, candidate_k and lexical_k only apply to
+        recommend().
+        """
+        start = time.perf_counter()
+        user_inputs = [normalize_user_input(u) for u in user_inputs]
+        if not user_inputs:
+            return []
+        user_embeddings = self.user_cache.encode(self.model, [build_user_text(u) for u in user_inputs],
+                                                 batch_size=batch_size, show_progress_bar=False)
+
+        chunk_users = max(1, max_chunk_bytes // (4 * len(self.data)))
+        results = []
+        for chunk_start in range(0, len(user_inputs), chunk_users):
+            chunk_end = chunk_start + chunk_users
+            similarity_chunk = self.index.score_matrix(user_embeddings[chunk_start:chunk_end])
+            for offset, text_similarities in enumerate(similarity_chunk):
+                i = chunk_start + offset
+                candidates = self.category_index.filter_rows(filters[i]) if filters else None
+                if candidates is None:
+                    text_similarities = self._hybrid(user_inputs[i], text_similarities)
+                    results.append(self._rank(user_inputs[i], text_similarities, top_n, scoring))
+                elif not len(candidates):
+                    results.append([])
+                else:
+                    results.append(self._rank(user_inputs[i],
+                                              self._hybrid(user_inputs[i], text_similarities[candidates], candidates),
+                                              top_n, scoring, candidates))
+
+        elapsed = time.perf_counter() - start
+        print(f"Scored {len(user_inputs)} profiles in {elapsed:.2f}s ({len(user_inputs) / elapsed:.1f} profiles/sec)")
+        return results
+
+    def _rank(self, user_input, text_similarities, top_n, scoring, candidates=None, timings=None):
+        # Structured scores are only computed for the rows recommend_jobs keeps, positions in
+        # text_similarities map back to catalog rows through candidates
+        def structured_scores(rows):
+            return self.structured.scores(user_input, rows if candidates is None else candidates[rows])
+
+        scoring = scoring or self.scoring
+        # Only the forest reads the feature rows, the rule scoring gets its structured half above
+        X = self.X if candidates is None or scoring != 'forest' else self.X[candidates]
+        salary_match, exp_match = self.category_index.match_masks(user_input, candidates)
+        recommendations, scores, text_scores = recommend_jobs(
+            user_input, None, X, self.data, self.preprocessor, text_similarities,
+            top_n=top_n, scoring=scoring, timings=timings, structured_scores=structured_scores,
+            salary_match=salary_match, exp_match=exp_match, rows=candidates)
+        start = time.perf_counter()
+
+        results = []
+        for (_, row), score, text_score in zip(recommendations.iterrows(), scores, text_scores):
+            result = {key: row[column] for column, key in RESULT_COLUMNS.items()}
+            result['salary'] = float(result['salary'])
+            result['combined_score'] = float(score)
+            result['text_score'] = float(text_score)
+            results.append(result)
+        if timings is not None:
+            timings['ranking'] = timings.get('ranking', 0.0) + time.perf_counter() - start
+        return results
+
+def main():
+    engine = RecommenderEngine()
+    while True:
+        user_input = get_user_input()
+        print("\nTop Career Recommendations:")
+        for result in engine.recommend(user_input):
+            print(f"\nJob Title: {result['job_title']}")
+            print(f"Company: {result['company']}")
+            print(f"Location: {result['location']}")
+            print(f"Experience Level: {result['experience_level']}")
+            print(f"Salary Category: {result['salary_category']}")
+            print(f"Industry: {result['industry']}")
+            print(f"Required Skills: {result['required_skills']}")
+            print(f"Combined Similarity Score: {result['combined_score']:.4f}")
+            print(f"Text Similarity Score: {result['text_score']:.4f}")
+        if input("\nRecommend for another user? (y/n): ").lower().strip() != 'y':
+            break
+
+
+if __name__ == "__main__":
+    main()
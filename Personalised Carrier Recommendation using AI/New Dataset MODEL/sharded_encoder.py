@@ -0,0 +1,90 @@
+import os
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from atomic_file import atomic_write
+from embedding_store import MODEL_NAME, HashingEmbedder, get_sentence_model, hash_texts
+
+SHARD_DIR = "embedding_shards"
+HASHING_MODEL = 'hashing'
+
+_worker_model = None
+
+
+def _init_worker(model_name, threads):
+    # Each process loads its own copy of the model and gets an even share of the cores
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model = HashingEmbedder() if model_name == HASHING_MODEL else get_sentence_model(model_name)
+
+
+def _encode_shard(texts, path, batch_size):
+    embeddings = np.asarray(_worker_model.encode(texts, batch_size=batch_size, show_progress_bar=False),
+                            dtype=np.float32)
+    with atomic_write(path) as f:
+        np.save(f, embeddings)
+    return len(texts)
+
+
+class ShardedEncoder:
+    """Drop-in for model.encode that splits the texts over a process pool.
+
+    Every shard is written to shard_dir under a hash of its texts, so a build
+    that is interrupted picks up where it stopped: finished shards are read
+    back instead of encoded again. Pass it to EmbeddingStore.sync in place of
+    the model and call clear() once the store has been written.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, workers=None, shard_size=20000, batch_size=128, shard_dir=SHARD_DIR):
+        self.model_name = model_name
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.batch_size = batch_size
+        self.shard_dir = shard_dir
+        self.written = []
+
+    def shard_path(self, texts):
+        digest = hashlib.blake2b(hash_texts(texts).tobytes(), digest_size=16).hexdigest()
+        return os.path.join(self.shard_dir, f"{self.model_name.replace('/', '_')}_{digest}.npy")
+
+    def encode(self, texts, batch_size=None, show_progress_bar=True, **kwargs):
+        texts = list(texts)
+        os.makedirs(self.shard_dir, exist_ok=True)
+        shards = [texts[start:start + self.shard_size] for start in range(0, len(texts), self.shard_size)]
+        paths = [self.shard_path(shard) for shard in shards]
+        pending = [i for i, path in enumerate(paths) if not os.path.exists(path)]
+        print(f"Sharded encode: {len(texts)} rows in {len(shards)} shards, "
+              f"{len(shards) - len(pending)} already on disk, {self.workers} workers")
+
+        if pending:
+            start = time.perf_counter()
+            done_rows = 0
+            pending_rows = sum(len(shards[i]) for i in pending)
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending)), initializer=_init_worker,
+                                     initargs=(self.model_name, threads)) as pool:
+                futures = [pool.submit(_encode_shard, shards[i], paths[i], batch_size or self.batch_size)
+                           for i in pending]
+                for done, future in enumerate(as_completed(futures), 1):
+                    done_rows += future.result()
+                    if show_progress_bar:
+                        elapsed = time.perf_counter() - start
+                        rate = done_rows / elapsed if elapsed else 0.0
+                        eta = (pending_rows - done_rows) / rate if rate else 0.0
+                        print(f"  shard {done}/{len(pending)}: {done_rows}/{pending_rows} rows, "
+                              f"{rate:.0f} rows/sec, ETA {eta:.0f}s")
+
+        self.written.extend(paths)
+        return np.concatenate([np.load(path) for path in paths])
+
+    def clear(self):
+        # Shards are only needed until the merged store is safely on disk
+        for path in self.written:
+            if os.path.exists(path):
+                os.remove(path)
+        self.written = []
@@ -0,0 +1,92 @@
+import re
+import numpy as np
+import pandas as pd
+from ranking import top_k
+
+SKILL_SEPARATORS = r'\s*(?:[,;/|\n]|\band\b)\s*'
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def skill_terms(text):
+    """Normalized skill phrases in text plus, for multi-word phrases, their words"""
+    phrases = [' '.join(p.split()) for p in re.split(SKILL_SEPARATORS, str(text).lower()) if p.strip()]
+    words = [w for p in phrases if ' ' in p for w in p.split() if len(w) > 1]
+    return list(dict.fromkeys(phrases + words))
+
+
+class SkillIndex:
+    """BM25 inverted index over the Required Skills column.
+
+    Terms are the comma separated skill phrases and their words. Posting
+    lists are stored CSR style: term_offsets into row_ids (int32) and the
+    precomputed BM25 weight of the term in each row (float32), so a query
+    only touches the postings of its own terms.
+    """
+
+    def __init__(self, data, column='Required Skills', k1=BM25_K1, b=BM25_B):
+        self.n_rows = len(data)
+        # Positional index so exploded rows carry row numbers whatever the frame's index is
+        phrases = pd.Series(np.asarray(data[column], dtype=str)).str.split(',').explode()
+        # Catalogs repeat a small vocabulary of skills, so normalize each distinct raw phrase once
+        phrase_codes, raw_phrases = pd.factorize(phrases.to_numpy())
+        phrase_terms = [skill_terms(phrase) for phrase in raw_phrases]
+        term_counts = np.array([len(t) for t in phrase_terms], dtype=np.int64)
+        term_codes, vocabulary = pd.factorize(np.array([t for ts in phrase_terms for t in ts], dtype=object),
+                                              sort=True)
+        term_starts = np.concatenate([[0], np.cumsum(term_counts)[:-1]])
+
+        # Expand every (row, raw phrase) occurrence into its (row, term) pairs
+        counts = term_counts[phrase_codes]
+        total = int(counts.sum())
+        pair_rows = np.repeat(phrases.index.to_numpy(), counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_terms = term_codes[np.repeat(term_starts[phrase_codes], counts) + within]
+
+        # Each (term, row) pair counted once per occurrence gives the term frequency
+        pair_keys, tf = np.unique(pair_terms.astype(np.int64) * self.n_rows + pair_rows, return_counts=True)
+        doc_lengths = np.bincount(pair_rows, minlength=self.n_rows).astype(np.float32)
+        pair_terms, pair_rows = np.divmod(pair_keys, self.n_rows)
+
+        avg_length = doc_lengths.mean() if self.n_rows and doc_lengths.mean() > 0 else 1.0
+        df = np.bincount(pair_terms, minlength=len(vocabulary))
+        idf = np.log(1 + (self.n_rows - df + 0.5) / (df + 0.5))
+        norm = tf + k1 * (1 - b + b * doc_lengths[pair_rows] / avg_length)
+
+        self.vocabulary = {term: i for i, term in enumerate(vocabulary)}
+        self.term_offsets = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+        self.row_ids = pair_rows.astype(np.int32)
+        self.weights = (idf[pair_terms] * tf * (k1 + 1) / norm).astype(np.float32)
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    def match(self, query):
+        """(row ids, BM25 scores) of every row sharing a term with query, ids ascending"""
+        term_ids = [self.vocabulary[t] for t in skill_terms(query) if t in self.vocabulary]
+        if not term_ids:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        slices = [slice(self.term_offsets[t], self.term_offsets[t + 1]) for t in term_ids]
+        rows = np.concatenate([self.row_ids[s] for s in slices])
+        weights = np.concatenate([self.weights[s] for s in slices])
+        ids, inverse = np.unique(rows, return_inverse=True)
+        return ids, np.bincount(inverse, weights=weights).astype(np.float32)
+
+    def search(self, query, k):
+        ids, scores = self.match(query)
+        return top_k(ids, scores, k)
+
+    def scores(self, query, rows=None):
+        """BM25 scores scaled to [0, 1] by the best match, for every row or just rows (sorted)"""
+        ids, scores = self.match(query)
+        out = np.zeros(self.n_rows if rows is None else len(rows), dtype=np.float32)
+        if not len(ids):
+            return out
+        if rows is None:
+            out[ids] = scores
+        else:
+            positions = np.minimum(np.searchsorted(rows, ids), len(rows) - 1)
+            found = rows[positions] == ids
+            out[positions[found]] = scores[found]
+        best = out.max()
+        return out / best if best > 0 else out
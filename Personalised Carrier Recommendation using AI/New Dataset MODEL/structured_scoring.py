@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from test_model import categorize_salary, experience_level_for
+
+
+class StructuredScorer:
+    """Structured half of combined_scores without building or multiplying one-hot rows.
+
+    create_user_profile always fills Industry and Location with the catalog
+    mode, so the cosine between the user row and a job row reduces to
+
+        (matches + z_user * z_job) / (|user| * |job|)
+
+    where matches counts equal one-hot groups and z is the scaled salary.
+    Jobs are grouped by (experience code, salary category code, industry is
+    mode, location is mode); a request computes matches once per group and
+    gathers it per job, then adds the salary term column-wise.
+    """
+
+    def __init__(self, data, preprocessor):
+        encoder = preprocessor.named_transformers_['cat']
+        scaler = preprocessor.named_transformers_['num']
+        # encoder.categories_ follows the column order the preprocessor was fitted with
+        columns = next(columns for name, _, columns in preprocessor.transformers_ if name == 'cat')
+        categories = dict(zip(columns, encoder.categories_))
+        self.experience_levels = list(categories['Experience Level'])
+        self.salary_levels = list(categories['Salary Category'])
+        self.salary_mean = float(scaler.mean_[0])
+        self.salary_scale = float(scaler.scale_[0])
+
+        codes = {}
+        for column in columns:
+            codes[column] = pd.Categorical(np.asarray(data[column], dtype=object), categories=categories[column]).codes
+        industry_is_mode = np.asarray(data['Industry'] == data['Industry'].mode()[0])
+        location_is_mode = np.asarray(data['Location'] == data['Location'].mode()[0])
+
+        signatures = pd.DataFrame({
+            'experience': codes['Experience Level'],
+            'salary_category': codes['Salary Category'],
+            'static_matches': industry_is_mode.astype(np.int8) + location_is_mode.astype(np.int8),
+        })
+        groups = signatures.groupby(list(signatures.columns), sort=False)
+        self.signature_ids = groups.ngroup().to_numpy()
+        table = groups.size().reset_index()
+        self.signature_experience = table['experience'].to_numpy()
+        self.signature_salary_category = table['salary_category'].to_numpy()
+        self.signature_static = table['static_matches'].to_numpy(dtype=float)
+
+        self.salary_z = (data['Salary'].to_numpy(dtype=float) - self.salary_mean) / self.salary_scale
+        known_groups = sum((c >= 0).astype(float) for c in codes.values())
+        self.row_norms = np.sqrt(known_groups + self.salary_z ** 2)
+        self.row_norms[self.row_norms == 0] = 1.0
+
+    def __len__(self):
+        return len(self.signature_experience)
+
+    def scores(self, user_input, rows=None):
+        """Structured cosine similarity of the user against every job (or just rows)"""
+        experience = experience_level_for(user_input['experience'])
+        salary_category = categorize_salary(user_input['expected_salary'])
+        experience_code = self.experience_levels.index(experience) if experience in self.experience_levels else -2
+        salary_code = self.salary_levels.index(salary_category) if salary_category in self.salary_levels else -2
+        user_z = (user_input['expected_salary'] - self.salary_mean) / self.salary_scale
+
+        matches = (self.signature_static
+                   + (self.signature_experience == experience_code)
+                   + (self.signature_salary_category == salary_code))
+        user_norm = np.sqrt(2 + (experience_code >= 0) + (salary_code >= 0) + user_z ** 2)
+
+        if rows is None:
+            signature_ids, salary_z, row_norms = self.signature_ids, self.salary_z, self.row_norms
+        else:
+            signature_ids, salary_z, row_norms = self.signature_ids[rows], self.salary_z[rows], self.row_norms[rows]
+        return (matches[signature_ids] + user_z * salary_z) / (row_norms * user_norm)
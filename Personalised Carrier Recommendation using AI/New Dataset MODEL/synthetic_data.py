@@ -0,0 +1,79 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+TITLE_ROLES = ['Engineer', 'Developer', 'Programmer', 'Scientist', 'Teacher', 'Educator', 'Administrator',
+               'Analyst', 'Manager', 'Consultant', 'Designer', 'Nurse', 'Accountant', 'Technician', 'Make']
+TITLE_PREFIXES = ['Software', 'Data', 'Senior', 'Junior', 'Lead', 'Cloud', 'Mechanical', 'Civil', 'Research',
+                  'Product', 'Sales', 'Marketing', 'Network', 'Clinical', 'Financial']
+BASE_INDUSTRIES = ['Software', 'Healthcare', 'Education', 'Finance', 'Retail', 'Manufacturing', 'Telecom',
+                   'Energy', 'Media', 'Government', 'Logistics', 'Hospitality']
+BASE_LOCATIONS = ['Bangalore', 'Mumbai', 'Delhi', 'Hyderabad', 'Chennai', 'Pune', 'Kolkata', 'Ahmedabad',
+                  'Jaipur', 'Remote']
+BASE_SKILLS = ['Python', 'Java', 'SQL', 'Excel', 'Communication', 'Teaching', 'Machine Learning', 'AWS',
+               'Project Management', 'Sales', 'Accounting', 'Nursing', 'AutoCAD', 'Leadership', 'Docker',
+               'Statistics', 'Marketing', 'Customer Service', 'JavaScript', 'Linux']
+EXPERIENCE_LEVELS = ['Entry Level', 'Mid Level', 'Senior Level']
+
+
+def _vocabulary(base, size, prefix):
+    # Extend the realistic names with numbered ones when a bigger vocabulary is asked for
+    return base[:size] + [f"{prefix} {i}" for i in range(len(base), size)]
+
+
+def generate_catalog(rows, n_industries=8, n_locations=10, n_skills=200, skills_per_job=(3, 6),
+                     missing_rate=0.01, duplicate_rate=0.02, seed=42):
+    """Deterministic job catalog with the same columns as job_recommendation_dataset.csv"""
+    rng = np.random.default_rng(seed)
+    industries = np.array(_vocabulary(BASE_INDUSTRIES, n_industries, 'Industry'), dtype=object)
+    locations = np.array(_vocabulary(BASE_LOCATIONS, n_locations, 'City'), dtype=object)
+    skills = np.array(_vocabulary(BASE_SKILLS, n_skills, 'Skill'), dtype=object)
+
+    titles = (np.array(TITLE_PREFIXES, dtype=object)[rng.integers(len(TITLE_PREFIXES), size=rows)] + " "
+              + np.array(TITLE_ROLES, dtype=object)[rng.integers(len(TITLE_ROLES), size=rows)])
+    experience = rng.integers(len(EXPERIENCE_LEVELS), size=rows)
+    # Salaries rise with seniority so the Low/Medium/High categories are all populated
+    salary = np.round(rng.normal(45000 + 25000 * experience, 15000).clip(15000, 250000), -2)
+
+    counts = rng.integers(skills_per_job[0], skills_per_job[1] + 1, size=rows)
+    picks = rng.integers(len(skills), size=(rows, skills_per_job[1]))
+    required_skills = [", ".join(dict.fromkeys(skills[row[:count]])) for row, count in zip(picks, counts)]
+
+    data = pd.DataFrame({
+        'Job Title': titles,
+        'Company': [f"Company {i}" for i in rng.integers(max(rows // 20, 1), size=rows)],
+        'Location': locations[rng.integers(len(locations), size=rows)],
+        'Experience Level': np.array(EXPERIENCE_LEVELS, dtype=object)[experience],
+        'Salary': salary,
+        'Industry': industries[rng.integers(len(industries), size=rows)],
+        'Required Skills': required_skills,
+    })
+
+    # Exercise the cleaning in load_dataset: blank cells and repeated postings
+    if duplicate_rate:
+        repeats = rng.choice(rows, size=int(rows * duplicate_rate), replace=False)
+        targets = rng.choice(rows, size=len(repeats), replace=False)
+        data.iloc[targets] = data.iloc[repeats].to_numpy()
+    if missing_rate:
+        data.loc[rng.random(rows) < missing_rate, 'Company'] = None
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic job_recommendation_dataset.csv")
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--industries', type=int, default=8)
+    parser.add_argument('--locations', type=int, default=10)
+    parser.add_argument('--skills', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='job_recommendation_dataset.csv')
+    args = parser.parse_args()
+
+    data = generate_catalog(args.rows, n_industries=args.industries, n_locations=args.locations,
+                            n_skills=args.skills, seed=args.seed)
+    data.to_csv(args.output, index=False)
+    print(f"Wrote {len(data)} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
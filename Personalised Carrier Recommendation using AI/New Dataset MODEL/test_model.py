@@ -1,11 +1,25 @@
+import os
+import time
+import logging
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestClassifier
-from sentence_transformers import SentenceTransformer
+from embedding_store import EmbeddingStore, MODEL_NAME, get_sentence_model, job_texts
+from ann_index import ExactIndex
+from ranking import top_k_indices
+from dataset_loader import read_dataset, title_keyword_mask, TITLE_MATCH_COLUMN
+from model_bundle import BUNDLE_DIR, load_bundle
+
+# Per-request diagnostics, debug level so a serving process doesn't pay for them
+logger = logging.getLogger(__name__)
+
+DATASET_PATH = os.environ.get(
+    "CAREER_DATASET_PATH",
+    r"C:\Users\metro\Desktop\UDP 7th Sem\Personalised Carrier Recommendation using AI\New Dataset MODEL\New Dataset\job_recommendation_dataset.csv")
 
 def categorize_salary(salary):
     if salary <= 50000:
@@ -15,86 +29,123 @@ def categorize_salary(salary):
     else:
         return 'High'
 
-def load_dataset():
-    data = pd.read_csv(r"C:\Users\metro\Desktop\UDP 7th Sem\Personalised Carrier Recommendation using AI\New Dataset MODEL\New Dataset\job_recommendation_dataset.csv")
-    data = data.dropna()
-    data['Salary'] = pd.to_numeric(data['Salary'], errors='coerce')
-    print(f"Initial dataset size: {len(data)} rows")
-    data = data[~data['Job Title'].str.lower().isin(['make'])]
-    data = data.drop_duplicates(subset=['Job Title', 'Industry', 'Required Skills'])
-    data['Salary Category'] = data['Salary'].apply(categorize_salary)
-    data = data.reset_index(drop=True)
+def load_dataset(path=DATASET_PATH, use_cache=True):
+    # Chunked CSV read and cleaning live in dataset_loader, repeat runs load its binary cache
+    data = read_dataset(path, use_cache=use_cache)
     print(f"Cleaned dataset size: {len(data)} rows")
     return data
 
-def preprocess_data(data):
+def preprocess_data(data, sparse=True):
     categorical_cols = ['Experience Level', 'Industry', 'Location', 'Salary Category']
     numerical_cols = ['Salary']
     
+    # sparse_threshold=1 keeps the one-hot output in CSR form whatever its density
     preprocessor = ColumnTransformer(
         transformers=[
             ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_cols),
             ('num', StandardScaler(), numerical_cols)
-        ])
+        ], sparse_threshold=1.0 if sparse else 0.0)
     
     X = preprocessor.fit_transform(data)
     return X, preprocessor, data
 
-def generate_text_embeddings(data, user_input):
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+def feature_row_norms(X):
+    if sp.issparse(X):
+        norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    else:
+        norms = np.linalg.norm(X, axis=1)
+    norms[norms == 0] = 1.0
+    return norms
+
+def structured_similarities(user_vector, X_rows, row_norms=None):
+    # Cosine similarity as one sparse mat-vec, with the job row norms computed once up front
+    if row_norms is None:
+        row_norms = feature_row_norms(X_rows)
+    dots = X_rows @ user_vector.T
+    dots = np.asarray(dots.todense() if sp.issparse(dots) else dots).ravel()
+    return dots / (row_norms * feature_row_norms(user_vector)[0])
+
+def generate_text_embeddings(data, user_input, store=None, model=None, user_cache=None, index=None):
+    model = model or get_sentence_model()
     
-    job_texts = data['Job Title'] + " " + data['Industry'] + " " + data['Required Skills']
-    job_embeddings = model.encode(job_texts.tolist(), show_progress_bar=False)
+    # Syncing hashes every job text, callers answering more than one request pass the
+    # index built over the synced rows so a request only encodes the user text
+    if index is None:
+        store = store or EmbeddingStore()
+        # Job rows come from the on-disk store, only changed rows get re-encoded
+        index = ExactIndex(store.sync(job_texts(data), model))
     
-    user_text = f"{user_input['interests']} {user_input['skills']} {user_input['profession']}"
-    user_embedding = model.encode([user_text], show_progress_bar=False)
+    if user_cache is not None:
+        user_embedding = user_cache.encode(model, [build_user_text(user_input)], show_progress_bar=False)
+    else:
+        user_embedding = model.encode([build_user_text(user_input)], show_progress_bar=False)
     
-    text_similarities = cosine_similarity(user_embedding, job_embeddings)[0]
+    text_similarities = index.scores(user_embedding[0])
     
     print(f"Text similarity stats: min={text_similarities.min():.4f}, max={text_similarities.max():.4f}, mean={text_similarities.mean():.4f}")
     
-    top_indices = np.argsort(text_similarities)[-10:]
+    top_indices = top_k_indices(text_similarities, 10)[::-1]
     print("\nTop 10 jobs by text similarity (for debugging):")
     for idx in top_indices:
         print(f"Job: {data.iloc[idx]['Job Title']}, Industry: {data.iloc[idx]['Industry']}, Similarity: {text_similarities[idx]:.4f}")
     
     return text_similarities
 
-def create_suitability_labels(data, user_input, text_similarities):
-    if len(text_similarities) != len(data):
-        raise ValueError(f"Mismatch: text_similarities ({len(text_similarities)}) and data ({len(data)}) have different lengths")
+def build_user_text(user_input):
+    return f"{user_input['interests']} {user_input['skills']} {user_input['profession']}"
+
+def experience_level_for(experience):
+    if experience <= 2:
+        return 'Entry Level'
+    elif experience <= 5:
+        return 'Mid Level'
+    elif experience > 5:
+        return 'Senior Level'
+    return None
+
+def create_suitability_labels(data, user_input, text_similarities, text_top=None, salary_match=None, exp_match=None,
+                              rows=None):
+    # rows, when given, picks the scored rows out of data so callers needn't copy a filtered frame
+    n_rows = len(data) if rows is None else len(rows)
+    if len(text_similarities) != n_rows:
+        raise ValueError(f"Mismatch: text_similarities ({len(text_similarities)}) and data ({n_rows}) have different lengths")
+    
+    # The keyword mask only depends on the dataset, load_dataset caches it as a column
+    if TITLE_MATCH_COLUMN in data:
+        title_match = data[TITLE_MATCH_COLUMN].to_numpy(dtype=bool)
+    else:
+        title_match = title_keyword_mask(data)
+    if rows is not None:
+        title_match = title_match[rows]
     
-    labels = []
-    profession_keywords = ['engineer', 'developer', 'programmer', 'scientist', 'teacher', 'educator', 'administrator']
-    user_salary_category = categorize_salary(user_input['expected_salary'])
+    text_match = np.asarray(text_similarities) > 0.4
+    if salary_match is None:
+        salary_match = _column(data, 'Salary Category', rows) == categorize_salary(user_input['expected_salary'])
+    if exp_match is None:
+        exp_match = _column(data, 'Experience Level', rows) == experience_level_for(user_input['experience'])
     
-    for idx, row in data.iterrows():
-        title_match = any(keyword in row['Job Title'].lower() for keyword in profession_keywords)
-        
-        text_match = text_similarities[idx] > 0.4
-        salary_match = row['Salary Category'] == user_salary_category
-        exp_match = (
-            (row['Experience Level'] == 'Entry Level' and user_input['experience'] <= 2) or
-            (row['Experience Level'] == 'Mid Level' and 2 < user_input['experience'] <= 5) or
-            (row['Experience Level'] == 'Senior Level' and user_input['experience'] > 5)
-        )
-        
-        if text_match and title_match and (salary_match or exp_match):
-            labels.append(1)
-        else:
-            labels.append(0)
+    labels = (text_match & title_match & (salary_match | exp_match)).astype(int)
     
-        if title_match and row['Industry'] not in [user_input['interests'], 'Software'] and labels[-1] == 1:
-            print(f"Warning: Mismatched industry for {row['Job Title']}: Expected {user_input['interests']} or Software, got {row['Industry']}")
+    if logger.isEnabledFor(logging.DEBUG):
+        # Only the labelled rows can be mismatched, look their industries up instead of every row's
+        labelled = np.flatnonzero(labels)
+        positions = labelled if rows is None else rows[labelled]
+        industries = data['Industry'].iloc[positions].to_numpy(dtype=object)
+        mismatched = ~pd.Series(industries, dtype=object).isin([user_input['interests'], 'Software']).to_numpy()
+        for title, industry in zip(data['Job Title'].iloc[positions[mismatched]].to_numpy(), industries[mismatched]):
+            logger.debug("Mismatched industry for %s: Expected %s or Software, got %s", title, user_input['interests'], industry)
     
-    if sum(labels) == 0:
-        top_indices = np.argsort(text_similarities)[-5:]  # Increased to top 5 for robustness
-        for idx in top_indices:
-            if any(keyword in data.iloc[idx]['Job Title'].lower() for keyword in profession_keywords):
-                labels[idx] = 1
+    if labels.sum() == 0:
+        # Increased to top 5 for robustness; callers that already ranked the text scores pass text_top
+        top_indices = text_top[:5] if text_top is not None and len(text_top) >= 5 else top_k_indices(text_similarities, 5)
+        labels[top_indices[title_match[top_indices]]] = 1
     
-    print(f"Label distribution: {sum(labels)} suitable, {len(labels) - sum(labels)} unsuitable")
-    return np.array(labels)
+    logger.debug("Label distribution: %d suitable, %d unsuitable", labels.sum(), len(labels) - labels.sum())
+    return labels
+
+def _column(data, column, rows=None):
+    values = data[column]
+    return (values if rows is None else values.iloc[rows]).to_numpy()
 
 def get_user_input():
     print("Welcome to the Personalized Career Recommendation System!")
@@ -120,56 +171,99 @@ def get_user_input():
         'experience': experience
     }
 
-def create_user_profile(user_input, preprocessor, data):
+def create_user_profiles(user_inputs, preprocessor, data):
+    # One preprocessor.transform call for any number of users
     user_data = pd.DataFrame({
-        'Experience Level': ['Entry Level' if user_input['experience'] <= 2 else 'Mid Level' if user_input['experience'] <= 5 else 'Senior Level'],
-        'Industry': [data['Industry'].mode()[0]],
-        'Location': [data['Location'].mode()[0]],
-        'Salary Category': [categorize_salary(user_input['expected_salary'])],
-        'Salary': [user_input['expected_salary']]
+        'Experience Level': [experience_level_for(u['experience']) for u in user_inputs],
+        'Industry': data['Industry'].mode()[0],
+        'Location': data['Location'].mode()[0],
+        'Salary Category': [categorize_salary(u['expected_salary']) for u in user_inputs],
+        'Salary': [u['expected_salary'] for u in user_inputs]
     })
     return preprocessor.transform(user_data)
 
-def recommend_jobs(user_input, user_vector, X, data, preprocessor, text_similarities, top_n=5):
-    labels = create_suitability_labels(data, user_input, text_similarities)
-    clf = RandomForestClassifier(n_estimators=100, random_state=42)
-    clf.fit(X, labels)
+def create_user_profile(user_input, preprocessor, data):
+    return create_user_profiles([user_input], preprocessor, data)
+
+SCORING_MODES = ('forest', 'rules')
+
+def recommend_jobs(user_input, user_vector, X, data, preprocessor, text_similarities, top_n=5, scoring='forest', timings=None,
+                   x_norms=None, structured_scores=None, salary_match=None, exp_match=None, rows=None):
+    if scoring not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode '{scoring}', expected one of {SCORING_MODES}")
     
-    try:
-        suitability_probs = clf.predict_proba(X)[:, 1]
-    except IndexError:
-        print("Warning: Only one class predicted. Falling back to text similarity.")
-        suitability_probs = text_similarities
-    
-    user_salary_category = categorize_salary(user_input['expected_salary'])
-    suitable_indices = np.where(
-        (suitability_probs > 0.5) & 
-        (data['Salary Category'] == user_salary_category)
-    )[0]
+    start = time.perf_counter()
+    text_similarities = np.asarray(text_similarities)
+    # Both the label fallback and the few-suitable fallback want the best text matches,
+    # and both the labels and the filter below want the salary match; compute each once
+    text_top = top_k_indices(text_similarities, max(top_n, 5))
+    # salary_match and exp_match may come precomputed from category_index.CategoryIndex
+    if salary_match is None:
+        salary_match = _column(data, 'Salary Category', rows) == categorize_salary(user_input['expected_salary'])
+    labels = create_suitability_labels(data, user_input, text_similarities, text_top=text_top,
+                                       salary_match=salary_match, exp_match=exp_match, rows=rows)
+    if scoring == 'rules':
+        # The forest is fit and evaluated on the same rows, so it mostly hands the
+        # rule labels back; use them directly instead of training per request
+        suitability_probs = labels
+    else:
+        clf = RandomForestClassifier(n_estimators=100, random_state=42)
+        clf.fit(X, labels)
+        
+        try:
+            suitability_probs = clf.predict_proba(X)[:, 1]
+        except IndexError:
+            logger.debug("Only one class predicted. Falling back to text similarity.")
+            suitability_probs = text_similarities
+    scored = time.perf_counter()
+    
+    suitable_indices = np.flatnonzero((suitability_probs > 0.5) & salary_match)
     if len(suitable_indices) < top_n:
-        print("Few suitable jobs found. Including high text-similarity jobs.")
-        top_text_indices = np.argsort(text_similarities)[-top_n:]
-        suitable_indices = np.unique(np.concatenate([suitable_indices, top_text_indices]))
+        logger.debug("Few suitable jobs found. Including high text-similarity jobs.")
+        suitable_indices = np.union1d(suitable_indices, text_top[:top_n])
     
-    X_suitable = X[suitable_indices]
-    similarities = cosine_similarity(user_vector, X_suitable)
+    if callable(structured_scores):
+        # Scores just the rows that survived the filters (see structured_scoring.StructuredScorer)
+        combined_scores = np.array(structured_scores(suitable_indices), dtype=float)
+    elif structured_scores is not None:
+        # Precomputed for every row by the caller
+        combined_scores = structured_scores[suitable_indices]
+    else:
+        X_suitable = X[suitable_indices]
+        combined_scores = structured_similarities(user_vector, X_suitable, None if x_norms is None else x_norms[suitable_indices])
     
-    combined_scores = 0.5 * similarities[0] + 0.5 * text_similarities[suitable_indices]
-    combined_scores = np.clip(combined_scores, 0, 1)
+    # 0.5 * structured + 0.5 * text, built in place on the gathered copy
+    combined_scores += text_similarities[suitable_indices]
+    combined_scores *= 0.5
+    np.clip(combined_scores, 0, 1, out=combined_scores)
     
-    top_indices = suitable_indices[combined_scores.argsort()[-top_n:][::-1]]
-    recommendations = data.iloc[top_indices][['Job Title', 'Company', 'Location', 'Experience Level', 'Salary', 'Salary Category', 'Industry', 'Required Skills']]
+    order = top_k_indices(combined_scores, top_n)
+    top_indices = suitable_indices[order]
+    recommendations = data.iloc[top_indices if rows is None else rows[top_indices]][['Job Title', 'Company', 'Location', 'Experience Level', 'Salary', 'Salary Category', 'Industry', 'Required Skills']]
     
-    return recommendations, combined_scores[combined_scores.argsort()[-top_n:][::-1]], text_similarities[top_indices]
+    if timings is not None:
+        timings['scoring'] = timings.get('scoring', 0.0) + scored - start
+        timings['ranking'] = timings.get('ranking', 0.0) + time.perf_counter() - scored
+    return recommendations, combined_scores[order], text_similarities[top_indices]
 
 # Main function
 def main():
-    data = load_dataset()
-    X, preprocessor, data = preprocess_data(data)
+    # The interactive run keeps showing the per-request diagnostics
+    logging.basicConfig(format="%(message)s")
+    logger.setLevel(logging.DEBUG)
+    # The bundle prepare_datamodel.py published for this CSV saves the cleaning, the fit and the encode
+    bundle = load_bundle(BUNDLE_DIR, DATASET_PATH, MODEL_NAME)
+    if bundle is not None:
+        print(f"Using model bundle {bundle.version}")
+        data, X, preprocessor, store, index = bundle.data, bundle.X, bundle.preprocessor, bundle.store, bundle.index
+    else:
+        data = load_dataset()
+        X, preprocessor, data = preprocess_data(data)
+        store = index = None
     
     user_input = get_user_input()
     
-    text_similarities = generate_text_embeddings(data, user_input)
+    text_similarities = generate_text_embeddings(data, user_input, store=store, index=index)
     
     user_vector = create_user_profile(user_input, preprocessor, data)
     
@@ -0,0 +1,14 @@
+import os
+import sys
+import pytest
+
+# The model code is a flat directory of modules that import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def catalog():
+    """Cleaned synthetic catalog, the same frame load_dataset would return for it"""
+    from dataset_loader import clean_dataset
+    from synthetic_data import generate_catalog
+    return clean_dataset(generate_catalog(3000, seed=7))
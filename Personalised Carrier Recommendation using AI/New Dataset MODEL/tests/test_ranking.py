@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from ranking import top_k_indices
+from test_model import categorize_salary, create_suitability_labels, recommend_jobs
+
+USERS = [
+    {'interests': 'software', 'skills': 'python', 'profession': 'engineer', 'expected_salary': 70000.0, 'experience': 3.0},
+    {'interests': 'education', 'skills': 'teaching', 'profession': 'teacher', 'expected_salary': 40000.0, 'experience': 8.0},
+    {'interests': 'healthcare', 'skills': 'nursing', 'profession': 'nurse', 'expected_salary': 120000.0, 'experience': 0.0},
+]
+
+
+def reference_top_k(scores, k):
+    return np.argsort(-np.asarray(scores), kind='stable')[:k]
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('k', [0, 1, 5, 37, 200, 1000])
+def test_top_k_indices_matches_stable_argsort(seed, k):
+    rng = np.random.default_rng(seed)
+    # Few distinct values so most of the top k are ties, plus some NaNs
+    scores = rng.integers(0, 8, size=500).astype(float) / 8
+    scores[rng.choice(500, size=20, replace=False)] = np.nan
+    np.testing.assert_array_equal(top_k_indices(scores, k), reference_top_k(scores, k))
+
+
+def test_top_k_indices_all_nan_and_all_tied():
+    np.testing.assert_array_equal(top_k_indices(np.full(10, np.nan), 3), [0, 1, 2])
+    np.testing.assert_array_equal(top_k_indices(np.ones(10, dtype=np.float32), 4), [0, 1, 2, 3])
+    np.testing.assert_array_equal(top_k_indices(np.array([0.5, np.nan, 0.5]), 3), [0, 2, 1])
+
+
+def reference_recommend(user_input, data, text_similarities, structured, top_n):
+    # The rules scoring of recommend_jobs written out with full sorts
+    labels = create_suitability_labels(data, user_input, text_similarities)
+    salary_match = data['Salary Category'].to_numpy() == categorize_salary(user_input['expected_salary'])
+    suitable = np.flatnonzero((labels > 0.5) & salary_match)
+    if len(suitable) < top_n:
+        suitable = np.union1d(suitable, reference_top_k(text_similarities, top_n))
+    combined = np.clip((structured[suitable] + text_similarities[suitable]) * 0.5, 0, 1)
+    order = reference_top_k(combined, top_n)
+    return suitable[order], combined[order]
+
+
+@pytest.mark.parametrize('user_input', USERS)
+@pytest.mark.parametrize('top_n', [5, 20])
+def test_recommend_jobs_matches_reference(catalog, user_input, top_n):
+    rng = np.random.default_rng(top_n)
+    # Rounded scores give plenty of exact ties in both halves of the combined score
+    text_similarities = np.round(rng.random(len(catalog)), 2).astype(np.float32)
+    structured = np.round(rng.random(len(catalog)), 1)
+
+    expected_rows, expected_scores = reference_recommend(user_input, catalog, text_similarities, structured, top_n)
+    recommendations, scores, text_scores = recommend_jobs(user_input, None, None, catalog, None, text_similarities,
+                                                          top_n=top_n, scoring='rules', structured_scores=structured)
+    np.testing.assert_array_equal(recommendations.index.to_numpy(), expected_rows)
+    np.testing.assert_array_equal(scores, expected_scores)
+    np.testing.assert_array_equal(text_scores, text_similarities[expected_rows])
+
+
+def test_recommend_jobs_rows_match_a_copied_subset(catalog):
+    rng = np.random.default_rng(0)
+    rows = np.sort(rng.choice(len(catalog), size=800, replace=False))
+    text_similarities = np.round(rng.random(len(rows)), 2).astype(np.float32)
+    structured = np.round(rng.random(len(rows)), 1)
+
+    subset = catalog.iloc[rows].reset_index(drop=True)
+    expected, expected_scores, _ = recommend_jobs(USERS[0], None, None, subset, None, text_similarities, top_n=10,
+                                                  scoring='rules', structured_scores=structured)
+    found, scores, _ = recommend_jobs(USERS[0], None, None, catalog, None, text_similarities, top_n=10,
+                                      scoring='rules', structured_scores=structured, rows=rows)
+    np.testing.assert_array_equal(found.index.to_numpy(), rows[expected.index.to_numpy()])
+    np.testing.assert_array_equal(scores, expected_scores)
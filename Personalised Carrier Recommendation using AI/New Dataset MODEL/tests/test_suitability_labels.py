@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from dataset_loader import TITLE_MATCH_COLUMN, salary_categories
+from test_model import categorize_salary, create_suitability_labels
+
+PROFESSION_KEYWORDS = ['engineer', 'developer', 'programmer', 'scientist', 'teacher', 'educator', 'administrator']
+
+
+def reference_labels(data, user_input, text_similarities):
+    # The original row by row implementation the vectorized one replaced
+    labels = []
+    user_salary_category = categorize_salary(user_input['expected_salary'])
+    for idx, row in data.iterrows():
+        title_match = any(keyword in row['Job Title'].lower() for keyword in PROFESSION_KEYWORDS)
+        text_match = text_similarities[idx] > 0.4
+        salary_match = row['Salary Category'] == user_salary_category
+        exp_match = (
+            (row['Experience Level'] == 'Entry Level' and user_input['experience'] <= 2) or
+            (row['Experience Level'] == 'Mid Level' and 2 < user_input['experience'] <= 5) or
+            (row['Experience Level'] == 'Senior Level' and user_input['experience'] > 5)
+        )
+        labels.append(1 if text_match and title_match and (salary_match or exp_match) else 0)
+
+    if sum(labels) == 0:
+        for idx in np.argsort(text_similarities)[-5:]:
+            if any(keyword in data.iloc[idx]['Job Title'].lower() for keyword in PROFESSION_KEYWORDS):
+                labels[idx] = 1
+    return np.array(labels)
+
+
+def user(expected_salary, experience):
+    return {'interests': 'software', 'skills': 'python', 'profession': 'engineer',
+            'expected_salary': expected_salary, 'experience': experience}
+
+
+@pytest.mark.parametrize('expected_salary', [0.0, 50000.0, 50000.01, 80000.0, 80000.5, 250000.0, float('nan')])
+@pytest.mark.parametrize('experience', [0.0, 2.0, 2.5, 5.0, 5.5, 30.0, float('nan')])
+def test_labels_match_iterrows(catalog, expected_salary, experience):
+    text_similarities = np.random.default_rng(0).random(len(catalog)).astype(np.float32)
+    user_input = user(expected_salary, experience)
+    np.testing.assert_array_equal(create_suitability_labels(catalog, user_input, text_similarities),
+                                  reference_labels(catalog, user_input, text_similarities))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_top5_fallback_matches_iterrows(catalog, seed):
+    # Nothing clears the 0.4 text threshold, so only the five best text matches can be labelled.
+    # Distinct scores keep the reference's ascending argsort from reordering ties
+    text_similarities = np.random.default_rng(seed).permutation(len(catalog)).astype(np.float64) / (3 * len(catalog))
+    user_input = user(60000.0, 3.0)
+    labels = create_suitability_labels(catalog, user_input, text_similarities)
+    np.testing.assert_array_equal(labels, reference_labels(catalog, user_input, text_similarities))
+    assert labels.sum() <= 5
+
+
+def test_labels_without_cached_title_column(catalog):
+    data = catalog.drop(columns=TITLE_MATCH_COLUMN)
+    text_similarities = np.random.default_rng(1).random(len(data)).astype(np.float32)
+    user_input = user(70000.0, 4.0)
+    np.testing.assert_array_equal(create_suitability_labels(data, user_input, text_similarities),
+                                  reference_labels(data, user_input, text_similarities))
+
+
+def test_salary_category_column_matches_categorize_salary():
+    # The Salary Category column the labels compare against is computed column-wise at load time
+    salaries = [15000.0, 50000.0, 50000.01, 80000.0, 80000.5, 250000.0, float('nan')]
+    assert list(salary_categories(salaries)) == [categorize_salary(s) for s in salaries]
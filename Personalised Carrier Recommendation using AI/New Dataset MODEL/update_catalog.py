@@ -0,0 +1,119 @@
+import io
+import sys
+import argparse
+import contextlib
+import numpy as np
+import pandas as pd
+from ann_index import INDEX_PATH, IVFIndex, _row_norms, build_index, load_index
+from dataset_loader import read_dataset, update_dataset
+from embedding_store import (EMBEDDINGS_PATH, MODEL_NAME, EmbeddingStore, HashingEmbedder, get_sentence_model,
+                             hash_texts, job_texts, match_rows)
+from test_model import DATASET_PATH, preprocess_data
+from model_bundle import BUNDLE_DIR, write_bundle
+
+
+def apply_catalog_delta(delta_path, dataset_path, store, index_path, model):
+    """Patch the catalog CSV, embedding store and ANN index with one delta file.
+
+    Only postings whose text is not in the store yet are encoded and the index
+    keeps its centroids, so a daily feed costs time in proportion to the delta.
+    """
+    index = None
+    if store.load() is not None:
+        index = load_index(index_path, store.embeddings, store.fingerprint())
+    old_hashes = store.hashes
+    if index is not None:
+        # The index only needs its norms and buckets to be patched, drop its view of the
+        # old memory map so sync can replace the file
+        index.embeddings = None
+
+    data = update_dataset(dataset_path, delta_path)
+    embeddings = store.sync(job_texts(data), model)
+    old_rows = match_rows(old_hashes, store.hashes)
+    if index is None:
+        print(f"No index matched the previous embeddings, building one over {len(embeddings)} rows")
+        index = build_index(embeddings, kind='ivf')
+    else:
+        index = index.patch(embeddings, old_rows)
+    index.save(index_path, fingerprint=store.fingerprint())
+    print(f"Catalog now has {len(data)} jobs, {int((old_rows < 0).sum())} newly encoded")
+    return data, embeddings, index
+
+
+def recall_at(index, embeddings, queries, k):
+    exact = build_index(embeddings, kind='exact')
+    hits = [len(set(exact.search(q, k)[0]) & set(index.search(q, k)[0])) for q in queries]
+    return sum(hits) / (k * len(queries))
+
+
+def check_consistency(dataset_path, data, store, index, model, sample=200, k=10, seed=42):
+    """Compare the patched artifacts against a full rebuild, returns a list of problems"""
+    problems = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        fresh = read_dataset(dataset_path, use_cache=False)
+    try:
+        pd.testing.assert_frame_equal(fresh, data, check_dtype=False, check_categorical=False)
+    except AssertionError as e:
+        problems.append(f"dataset differs from a full CSV read: {e}")
+        return problems
+
+    texts = job_texts(fresh)
+    if not np.array_equal(hash_texts(texts), store.hashes):
+        problems.append("embedding store rows do not match the dataset texts")
+        return problems
+
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(texts), size=min(sample, len(texts)), replace=False))
+    expected = np.asarray(model.encode([texts[i] for i in rows], show_progress_bar=False), dtype=np.float32)
+    stored = store.embeddings[rows]
+    cosines = np.sum(expected * stored, axis=1) / (
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(stored, axis=1) + 1e-12)
+    if cosines.min() < 0.999:
+        problems.append(f"stored embeddings differ from a fresh encode (min cosine {cosines.min():.4f})")
+
+    if not np.allclose(index.norms, _row_norms(store.embeddings), atol=1e-5):
+        problems.append("index norms differ from the stored embeddings")
+    if isinstance(index, IVFIndex):
+        if not np.array_equal(np.sort(index.list_ids), np.arange(len(texts))):
+            problems.append("IVF lists do not cover every job exactly once")
+        rebuilt = build_index(store.embeddings, kind='ivf', n_probe=index.n_probe)
+        patched_recall = recall_at(index, store.embeddings, expected, k)
+        rebuilt_recall = recall_at(rebuilt, store.embeddings, expected, k)
+        print(f"IVF recall@{k}: patched={patched_recall:.3f}, full rebuild={rebuilt_recall:.3f}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a catalog delta (added, changed and removed postings)")
+    parser.add_argument('delta', help="CSV with the catalog columns plus Action (add, change or remove)")
+    parser.add_argument('--dataset', default=DATASET_PATH)
+    parser.add_argument('--embeddings', default=EMBEDDINGS_PATH)
+    parser.add_argument('--index', default=INDEX_PATH)
+    parser.add_argument('--verify', action='store_true', help="Check the patched artifacts against a full rebuild")
+    parser.add_argument('--verify-sample', type=int, default=200, help="Rows re-encoded by --verify")
+    parser.add_argument('--hashing', action='store_true',
+                        help="Use the offline hashing embedder instead of the SentenceTransformer")
+    parser.add_argument('--bundle-dir', default=BUNDLE_DIR, help="Publish the patched artifacts as a new model bundle here")
+    parser.add_argument('--no-bundle', action='store_true', help="Leave the published model bundles alone")
+    args = parser.parse_args()
+
+    model = HashingEmbedder() if args.hashing else get_sentence_model()
+    store = EmbeddingStore(args.embeddings)
+    data, _, index = apply_catalog_delta(args.delta, args.dataset, store, args.index, model)
+    if args.verify:
+        problems = check_consistency(args.dataset, data, store, index, model, sample=args.verify_sample)
+        for problem in problems:
+            print(f"Consistency check failed: {problem}")
+        if problems:
+            sys.exit(1)
+        print("Consistency check passed")
+    if not args.no_bundle:
+        # The CSV changed, so the current bundle no longer validates; predicting_model.pkl was
+        # trained on the old rows and is left out until prepare_datamodel.py runs again
+        X, preprocessor, data = preprocess_data(data)
+        write_bundle(args.bundle_dir, args.dataset, data, X, preprocessor, store, index,
+                     embedding_model=getattr(model, 'name', MODEL_NAME))
+
+
+if __name__ == "__main__":
+    main()